@@ -0,0 +1,56 @@
+"""
+Per-update latency of the diamond bank storage engines.
+
+Fills each backend with N accounts, then times single balance changes that are
+persisted immediately (the worst case for the write-back ledger).
+
+Run from the repository root:
+    python -m benchmarks.bank_backends
+"""
+import os
+import random
+import tempfile
+import time
+
+from commands.bank import JsonBankStorage, SqliteBankStorage
+
+ACCOUNT_COUNTS = [1_000, 10_000, 100_000]
+UPDATES = 50
+SERVERS = 10
+
+def build_bank(num_accounts):
+    data = {}
+    for i in range(num_accounts):
+        data.setdefault(f"server{i % SERVERS}", {})[str(100000000000000000 + i)] = random.randint(0, 10_000)
+    return data
+
+def time_updates(storage, data):
+    accounts = [(sid, uid) for sid, players in data.items() for uid in players]
+    samples = []
+    for sid, uid in random.sample(accounts, UPDATES):
+        data[sid][uid] += 1
+        start = time.perf_counter()
+        storage.save(data, {sid: {uid}})
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return sum(samples) / len(samples), samples[len(samples) // 2]
+
+def main():
+    print(f"{'accounts':>10} {'backend':>8} {'mean ms':>10} {'median ms':>10}")
+    original_dir = os.getcwd()
+    for num_accounts in ACCOUNT_COUNTS:
+        data = build_bank(num_accounts)
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            os.mkdir("data")
+            try:
+                for storage in (JsonBankStorage(), SqliteBankStorage()):
+                    storage.save(data, {sid: set(players) for sid, players in data.items()})
+                    mean, median = time_updates(storage, data)
+                    storage.close()
+                    print(f"{num_accounts:>10} {storage.name:>8} {mean * 1000:>10.3f} {median * 1000:>10.3f}")
+            finally:
+                os.chdir(original_dir)
+
+if __name__ == "__main__":
+    main()
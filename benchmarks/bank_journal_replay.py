@@ -0,0 +1,43 @@
+"""
+Startup replay speed of the bank transaction journal.
+
+Writes N journal records spread over a fixed set of accounts, then times how
+long BankJournal.replay takes to rebuild balances from them. Compaction keeps
+the live journal under JOURNAL_COMPACT_RECORDS, which bounds startup replay.
+
+Run from the repository root:
+    python -m benchmarks.bank_journal_replay
+"""
+import os
+import random
+import tempfile
+import time
+
+from commands.bank import BankJournal, JOURNAL_COMPACT_RECORDS
+
+RECORD_COUNTS = [JOURNAL_COMPACT_RECORDS, 100_000, 1_000_000]
+ACCOUNTS = 10_000
+BATCH = 1_000
+SERVERS = 10
+
+def main():
+    print(f"{'records':>10} {'append s':>10} {'replay s':>10} {'records/s':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for num_records in RECORD_COUNTS:
+            journal = BankJournal(os.path.join(tmp, f"bank_{num_records}.journal"))
+            start = time.perf_counter()
+            for _ in range(num_records // BATCH):
+                journal.append([
+                    (f"server{i % SERVERS}", str(100000000000000000 + random.randrange(ACCOUNTS)), 100, random.randint(0, 10_000), "chat_reward")
+                    for i in range(BATCH)
+                ])
+            append_time = time.perf_counter() - start
+            journal.close()
+
+            start = time.perf_counter()
+            journal.replay({})
+            replay_time = time.perf_counter() - start
+            print(f"{num_records:>10} {append_time:>10.3f} {replay_time:>10.3f} {num_records / replay_time:>12,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Games per second of the pure blackjack engine (no Discord, no bank).
+
+Each game is a fresh BlackjackGame, like /blackjack creates: deal, play the
+player's hand with the given policy, then let the dealer play.
+
+Run from the repository root:
+    python -m benchmarks.blackjack_engine
+"""
+import time
+
+from commands.blackjack_commands import BlackjackGame, CARD_POINTS
+from commands.blackjack_odds import BASIC_STRATEGY
+
+GAMES = 200_000
+
+def hit_below_17(game):
+    return game.player_hand.total < 17
+
+def basic_strategy(game):
+    hand = game.player_hand
+    return BASIC_STRATEGY[(hand.total, hand.soft, CARD_POINTS[game.dealer_hand.cards[0]])] == "hit"
+
+def play(policy, games: int):
+    for _ in range(games):
+        game = BlackjackGame()
+        game.start_game()
+        while not game.game_over and policy(game):
+            game.player_hit()
+        game.dealer_play()
+
+def main():
+    for name, policy in (("hit below 17", hit_below_17), ("basic strategy", basic_strategy)):
+        start = time.perf_counter()
+        play(policy, GAMES)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<15} {GAMES:,} games in {elapsed:.2f}s: {GAMES / elapsed:,.0f} games/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Cold and warm solve times of the blackjack odds solver.
+
+Cold: every cache cleared, then the full basic-strategy table is solved from
+scratch (what the first import pays). Warm: random (total, soft, upcard)
+lookups against the filled LRU, which is what the Hint button does.
+
+Run from the repository root:
+    python -m benchmarks.blackjack_solver
+"""
+import random
+import time
+
+from commands.blackjack_odds import UPCARDS, build_basic_strategy, clear_caches, solve
+
+COLD_RUNS = 20
+WARM_LOOKUPS = 100_000
+
+def main():
+    cold = []
+    for _ in range(COLD_RUNS):
+        clear_caches()
+        start = time.perf_counter()
+        build_basic_strategy()
+        cold.append(time.perf_counter() - start)
+    print(f"cold: full table in {min(cold) * 1000:.2f} ms (best of {COLD_RUNS}), {sum(cold) / len(cold) * 1000:.2f} ms avg")
+
+    states = [(random.randint(12, 21), random.random() < 0.3, random.choice(UPCARDS)) for _ in range(WARM_LOOKUPS)]
+    start = time.perf_counter()
+    for state in states:
+        solve(*state)
+    elapsed = time.perf_counter() - start
+    print(f"warm: {elapsed / WARM_LOOKUPS * 1e6:.2f} µs per lookup over {WARM_LOOKUPS:,} lookups")
+    print(f"cache: {solve.cache_info()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+/ask autocomplete latency against the in-memory character index.
+
+Builds a characters file with many servers and characters in a temp directory,
+loads it into a CharacterStore once, then times complete() for random typed
+prefixes (1-4 letters, including ones that only match as substrings).
+
+Run from the repository root:
+    python -m benchmarks.character_autocomplete
+"""
+import os
+import random
+import string
+import tempfile
+import time
+
+from commands.async_io import write_json
+from commands.characters import CharacterStore
+
+SERVERS = 1000
+CHARACTERS_PER_SERVER = 500
+LOOKUPS = 100_000
+
+def random_name():
+    return "".join(random.choices(string.ascii_lowercase, k=random.randint(4, 12)))
+
+def main():
+    characters = {
+        str(gid): {f"{random_name()}_desc": "x" * 200 for _ in range(CHARACTERS_PER_SERVER)}
+        for gid in range(SERVERS)
+    }
+    path = os.path.join(tempfile.mkdtemp(), "characters.json")
+    write_json(path, characters)
+
+    start = time.perf_counter()
+    store = CharacterStore(path)
+    print(f"load: {SERVERS:,} servers x {CHARACTERS_PER_SERVER} characters in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    queries = [(str(random.randrange(SERVERS)), random_name()[:random.randint(1, 4)]) for _ in range(LOOKUPS)]
+    worst = 0.0
+    start = time.perf_counter()
+    for gid, current in queries:
+        began = time.perf_counter()
+        store.complete(gid, current)
+        worst = max(worst, time.perf_counter() - began)
+    elapsed = time.perf_counter() - start
+    print(f"complete: {elapsed / LOOKUPS * 1e6:.1f} µs avg, {worst * 1e6:.0f} µs worst over {LOOKUPS:,} lookups")
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,14 @@ from discord import app_commands
 from discord.ext import commands
 import google.generativeai as genai
 import openai
-import time
 
 # Import all command groups
 from commands import gemini_commands, image_commands
 from commands import utility_commands, fun_commands, siege_of_six, setup_screenshot
-from commands.bank import get_player_diamonds, update_player_diamonds
+from commands.bank import bank_ledger, configure_bank
+from commands.async_io import enable_blocking_detector
+from commands.rewards import chat_rewards
+from commands.cooldowns import create_cooldown_store
 from commands import blackjack_commands, slot_machine_commands, roulette_commands
 from commands import goals, profile
 
@@ -23,6 +25,9 @@ master_server = int(config["master_server"])
 gemini_api_key = config["gemini_api_key"]
 openai.api_key = config["openai_api_key"]
 
+# Diamond bank storage: "json" (data/bank.json) or "sqlite" (data/bank.db, imported from bank.json on first run)
+configure_bank(config.get("bank_backend", "json"))
+
 genai.configure(api_key=gemini_api_key)
 model = genai.GenerativeModel('gemini-2.5-pro')
 
@@ -34,14 +39,14 @@ client = commands.Bot(command_prefix=prefix, intents=intents)
 client.remove_command("help") 
 
 # --- All command registration happens here, before on_ready ---
-gemini_commands.gemini_commands(model, client.tree)
+ask_cache = gemini_commands.gemini_commands(model, client.tree, config)
 image_commands.image_commands(openai, client.tree, master_server)
 utility_commands.utility_commands(client.tree, config, master_server)
 setup_screenshot.setup_screenshot(client.tree)
 fun_commands.fun_commands(client.tree)
 siege_of_six.siege_of_six_commands(config, client.tree)
 slot_machine_commands.setup_slot_machine_commands(client.tree)
-blackjack_commands.setup_blackjack_commands(client.tree)
+blackjack_shoes = blackjack_commands.setup_blackjack_commands(client.tree, config)
 roulette_commands.setup_roulette_commands(client.tree) 
 goals.setup_goal_commands(client.tree, master_server)
 profile.setup_profile_commands(client.tree, master_server)
@@ -49,6 +54,16 @@ profile.setup_profile_commands(client.tree, master_server)
 @client.event
 async def on_ready():
     print(f"Logged in as {client.user}")
+    # Optional "debug_blocking_ms" config key: log any handler step that blocks the loop longer than that
+    if config.get("debug_blocking_ms"):
+        enable_blocking_detector(config["debug_blocking_ms"])
+    await bank_ledger.load_async()
+    bank_ledger.start_autoflush()
+    chat_rewards.start()
+    chat_cooldowns.start_autosave()
+    blackjack_shoes.start_autosave()
+    ask_cache.start_autosave()
+    await blackjack_commands.restore_open_games(client, blackjack_shoes)
     activity = discord.Game(name="Cooking up greatness")
     await client.change_presence(status=discord.Status.online, activity=activity)
     
@@ -63,11 +78,12 @@ async def on_ready():
     except Exception as e:
         print(f"Failed to sync commands: {e}")
         
-user_cooldowns = {}
-
 COOLDOWN_SECONDS = 5 * 60  # 5 minutes
 DIAMONDS_REWARD = 100
 
+# Expires on its own and is saved to disk, so a restart doesn't hand everyone a free reward
+chat_cooldowns = create_cooldown_store(COOLDOWN_SECONDS, "data/cooldowns.json")
+
 @client.event
 async def on_message(message):
     # Ignore bots
@@ -77,13 +93,9 @@ async def on_message(message):
     user_id = str(message.author.id)
     server_id = str(message.guild.id) if message.guild else "dm"  # handle DMs if you want
 
-    now = time.time()
-    last_time = user_cooldowns.get(user_id, 0)
-
-    if now - last_time >= COOLDOWN_SECONDS:
-        # Give diamonds silently
-        update_player_diamonds(server_id, user_id, DIAMONDS_REWARD)
-        user_cooldowns[user_id] = now
+    if chat_cooldowns.try_acquire(user_id):
+        # Give diamonds silently (queued and paid out in batches every few seconds)
+        chat_rewards.enqueue(server_id, user_id, DIAMONDS_REWARD)
 
     await client.process_commands(message)
         
@@ -97,4 +109,6 @@ async def on_command_error(ctx, error):
     else:
         print(f"Unhandled error: {error}")
 
-client.run(token)
\ No newline at end of file
+client.run(token)
+chat_rewards.flush()
+bank_ledger.flush()
\ No newline at end of file
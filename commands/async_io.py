@@ -0,0 +1,135 @@
+import asyncio
+import functools
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Constants ---
+IO_WORKERS = 8  # Threads for disk access and blocking SDK calls
+
+# Dedicated pool so slow Gemini/OpenAI calls can't starve asyncio's default executor (DNS lookups etc.)
+io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="bot-io")
+
+async def run_blocking(func, *args, **kwargs):
+    """Runs a blocking function on the I/O thread pool and awaits its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor, functools.partial(func, *args, **kwargs))
+
+# --- JSON File Helpers ---
+def read_json(path: str, default=None):
+    """Reads a JSON file, returning `default` (an empty dict if not given) if it doesn't exist."""
+    if not os.path.exists(path):
+        return {} if default is None else default
+    with open(path, "r") as f:
+        return json.load(f)
+
+def write_json(path: str, data):
+    """Writes a JSON file through a temp file so readers never see it half-written."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+async def read_json_async(path: str, default=None):
+    return await run_blocking(read_json, path, default)
+
+async def write_json_async(path: str, data):
+    await run_blocking(write_json, path, data)
+
+# --- Persisted Stores ---
+class JsonPersister:
+    """
+    Saves an in-memory store to a JSON file. The store calls mark_dirty() when it changes
+    and picks when the change is written:
+      - save_async() now (saves are serialised, so an older snapshot never overwrites a newer one),
+      - schedule() after `delay` seconds, so a burst of changes costs one write,
+      - start_autosave(interval) on a fixed period, and
+      - save() at shutdown (register it with atexit).
+    `snapshot()` is called on the event loop and must return plain JSON data; `changed()`, if
+    given, reports changes the store tracks itself. A failed write leaves the store dirty, so
+    the next save (and the one at exit) tries again. With path=None nothing is ever written.
+    """
+    def __init__(self, path: str, snapshot, changed=None, delay: float = None, name: str = "data"):
+        self.path = path
+        self.snapshot = snapshot
+        self.changed = changed
+        self.delay = delay
+        self.name = name
+        self.dirty = False
+        self.saves = 0
+        self.failures = 0
+        self._lock = asyncio.Lock()
+        self._task = None
+        self._handle = None
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def pending(self):
+        return self.dirty or (self.changed is not None and self.changed())
+
+    def _take_snapshot(self):
+        # Runs on the event loop, so nothing can change between the snapshot and clearing the flag
+        data = self.snapshot()
+        self.dirty = False
+        return data
+
+    def save(self):
+        """Writes the store now if it changed, blocking (for shutdown)."""
+        if self.path and self.pending():
+            write_json(self.path, self._take_snapshot())
+            self.saves += 1
+
+    async def save_async(self):
+        """Writes the store on the I/O pool if it changed, and returns once it's on disk."""
+        if not self.path:
+            return
+        async with self._lock:
+            if not self.pending():
+                return
+            snapshot = self._take_snapshot()
+            try:
+                await run_blocking(write_json, self.path, snapshot)
+                self.saves += 1
+            except Exception as e:
+                self.dirty = True
+                self.failures += 1
+                print(f"Failed to save {self.name} to {self.path}: {e}")
+
+    def schedule(self):
+        """Marks the store changed and saves it `delay` seconds from now, unless a save is already scheduled."""
+        self.dirty = True
+        if self.path and self._handle is None:
+            self._handle = asyncio.get_running_loop().call_later(self.delay, self._start_scheduled)
+
+    def _start_scheduled(self):
+        self._handle = None
+        asyncio.get_running_loop().create_task(self._save_scheduled())
+
+    async def _save_scheduled(self):
+        await self.save_async()
+        if self.dirty:
+            self.schedule()  # The write failed; try again after another delay
+
+    def start_autosave(self, interval: float):
+        """Starts saving every `interval` seconds on the running event loop. Calling it again does nothing."""
+        if self.path and (self._task is None or self._task.done()):
+            self._task = asyncio.get_running_loop().create_task(self._autosave_loop(interval))
+
+    async def _autosave_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.save_async()
+
+# --- Debugging ---
+def enable_blocking_detector(threshold_ms: float):
+    """
+    Puts the running event loop in debug mode so asyncio logs every callback or task step
+    that holds the loop for longer than `threshold_ms` (logged as "Executing <Task ...> took X seconds").
+    """
+    loop = asyncio.get_running_loop()
+    loop.set_debug(True)
+    loop.slow_callback_duration = threshold_ms / 1000
+    logging.getLogger("asyncio").setLevel(logging.WARNING)
+    print(f"Blocking detector on: logging event loop steps slower than {threshold_ms}ms.")
@@ -1,13 +1,25 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+import asyncio
+import atexit
 import random
 import json
 import os
+import sqlite3
+import time
+from decimal import Decimal, ROUND_HALF_EVEN
+from .async_io import run_blocking
+from .leaderboard import LeaderboardIndex
 
 # --- Constants ---
 BANK_FILE = 'data/bank.json'
+BANK_DB_FILE = 'data/bank.db'
+BANK_JOURNAL_FILE = 'data/bank.journal'
 STARTING_DIAMONDS = 50
+DIAMOND_SCALE = 1000  # Balances are held as integer milli-diamonds
+FLUSH_INTERVAL_SECONDS = 30  # How often dirty balances are written back to disk
+JOURNAL_COMPACT_RECORDS = 10_000  # Compact early once the journal holds this many records
 
 # --- Bank Management Functions ---
 def load_bank_data():
@@ -20,7 +32,9 @@ def load_bank_data():
             json.dump({}, f)
         return {}
     except json.JSONDecodeError:
-        print(f"Warning: {BANK_FILE} is empty or corrupted. Starting with an empty bank.")
+        # Keep the damaged file around instead of overwriting it on the next save.
+        os.replace(BANK_FILE, f"{BANK_FILE}.corrupt")
+        print(f"Warning: {BANK_FILE} is empty or corrupted (kept as {BANK_FILE}.corrupt). Starting from the journal only.")
         return {}
 
     # --- Migration: flat {user_id: amount} -> {server_id: {user_id: amount}} ---
@@ -34,29 +48,502 @@ def load_bank_data():
     return data
 
 def save_bank_data(data):
-    """Saves diamond data to bank.json."""
-    with open(BANK_FILE, 'w') as f:
+    """Saves diamond data to bank.json (written to a temp file, then renamed over the old one)."""
+    tmp_file = f"{BANK_FILE}.tmp"
+    with open(tmp_file, 'w') as f:
         json.dump(data, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, BANK_FILE)
+
+# --- Fixed-Point Amounts ---
+def to_units(amount):
+    """
+    Converts a diamond amount to integer milli-diamonds. Fractions are rounded to the
+    nearest milli-diamond, ties to even, using the shortest decimal form of floats
+    (so 109.99999999999999 becomes exactly 110 diamonds).
+    """
+    if isinstance(amount, int):
+        return amount * DIAMOND_SCALE
+    return int((Decimal(str(amount)) * DIAMOND_SCALE).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+def from_units(units: int):
+    """Converts milli-diamonds back to diamonds: an int for whole amounts, else a float with at most 3 decimals."""
+    whole, rest = divmod(units, DIAMOND_SCALE)
+    return whole if rest == 0 else units / DIAMOND_SCALE
+
+def round_diamonds(amount):
+    """Rounds an amount the same way the bank will store it (to the nearest milli-diamond)."""
+    return from_units(to_units(amount))
+
+STARTING_UNITS = to_units(STARTING_DIAMONDS)
+
+# --- Storage Engines ---
+class JsonBankStorage:
+    """Stores the whole bank as a single bank.json document."""
+    name = "json"
+
+    def load(self):
+        """Returns {server_id: {user_id: milli-diamonds}}. bank.json itself stays in whole diamonds."""
+        raw = load_bank_data()
+        data = {sid: {uid: to_units(amt) for uid, amt in players.items()} for sid, players in raw.items()}
+        # Migration: rewrite float balances that drifted (e.g. 109.99999999999999) with their exact value.
+        drifted = sum(
+            1 for sid, players in raw.items() for uid, amt in players.items()
+            if from_units(data[sid][uid]) != amt
+        )
+        if drifted:
+            print(f"Converting {drifted} fractional balances in {BANK_FILE} to fixed-point...")
+            self.save(data, None)
+        return data
+
+    def prepare(self, data, dirty):
+        """Copies what write() needs, so it can run on another thread while balances keep changing."""
+        # A JSON document can only be rewritten in full, whatever changed.
+        return {sid: {uid: from_units(units) for uid, units in players.items()} for sid, players in data.items()}
+
+    def write(self, payload):
+        save_bank_data(payload)
+
+    def save(self, data, dirty):
+        self.write(self.prepare(data, dirty))
+
+    def close(self):
+        pass
+
+class SqliteBankStorage:
+    """Stores one row per (server_id, user_id) in SQLite (WAL mode) and upserts only changed rows."""
+    name = "sqlite"
+
+    def __init__(self, path: str = BANK_DB_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            with self.conn:
+                self._create_schema()
+            self.import_json()
+        elif version == 1:
+            self._migrate_to_units()
+
+    def _create_schema(self, table: str = "balances"):
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " server_id TEXT NOT NULL,"
+            " user_id TEXT NOT NULL,"
+            " units INTEGER NOT NULL,"
+            " PRIMARY KEY (server_id, user_id)"
+            ") WITHOUT ROWID"
+        )
+        self.conn.execute("PRAGMA user_version = 2")
+
+    def _migrate_to_units(self):
+        """Schema 1 stored diamonds as NUMERIC (floats included); schema 2 stores integer milli-diamonds."""
+        rows = [(sid, uid, to_units(amt)) for sid, uid, amt in self.conn.execute("SELECT server_id, user_id, diamonds FROM balances")]
+        with self.conn:
+            self.conn.execute("BEGIN")  # DDL doesn't open a transaction by itself; keep the swap atomic
+            self._create_schema("balances_units")
+            self.conn.executemany("INSERT INTO balances_units (server_id, user_id, units) VALUES (?, ?, ?)", rows)
+            self.conn.execute("DROP TABLE balances")
+            self.conn.execute("ALTER TABLE balances_units RENAME TO balances")
+        print(f"Converted {len(rows)} balances in {self.path} to fixed-point.")
+
+    def import_json(self):
+        """One-shot import of bank.json (old flat files are migrated by load_bank_data first)."""
+        if not os.path.exists(BANK_FILE):
+            return 0
+        data = load_bank_data()
+        rows = [(sid, uid, to_units(amt)) for sid, players in data.items() for uid, amt in players.items()]
+        with self.conn:
+            self.conn.executemany(UPSERT_BALANCE_SQL, rows)
+        if rows:
+            print(f"Imported {len(rows)} accounts from {BANK_FILE} into {self.path}.")
+        return len(rows)
+
+    def load(self):
+        data = {}
+        for sid, uid, units in self.conn.execute("SELECT server_id, user_id, units FROM balances"):
+            data.setdefault(sid, {})[uid] = units
+        return data
+
+    def prepare(self, data, dirty):
+        """Copies what write() needs, so it can run on another thread while balances keep changing."""
+        return [(sid, uid, data[sid][uid]) for sid, players in dirty.items() for uid in players]
+
+    def write(self, payload):
+        with self.conn:
+            self.conn.executemany(UPSERT_BALANCE_SQL, payload)
+
+    def save(self, data, dirty):
+        self.write(self.prepare(data, dirty))
+
+    def close(self):
+        self.conn.close()
+
+UPSERT_BALANCE_SQL = (
+    "INSERT INTO balances (server_id, user_id, units) VALUES (?, ?, ?) "
+    "ON CONFLICT(server_id, user_id) DO UPDATE SET units = excluded.units"
+)
+
+STORAGE_BACKENDS = {
+    "json": JsonBankStorage,
+    "sqlite": SqliteBankStorage,
+}
+
+# --- Transaction Journal ---
+class BankJournal:
+    """
+    Append-only log of every balance change since the last snapshot, one JSON object per line.
+    Each record carries the resulting balance, so replaying a record twice is harmless.
+    """
+    def __init__(self, path: str = BANK_JOURNAL_FILE):
+        self.path = path
+        self.rotated_path = f"{path}.old"  # Records being compacted into a snapshot right now (.old, .old.1, ...)
+        self.records = 0  # Records written since the last compaction
+        self._file = None
+
+    def append(self, entries):
+        """
+        Appends (server_id, player_id, delta, balance, reason) entries (in milli-diamonds) in a single write.
+        This stays on the event loop: it's a write into the OS page cache (no fsync), and the
+        balance change it records is applied without awaiting, so the record must be too.
+        """
+        now = round(time.time(), 3)
+        lines = "".join(
+            json.dumps({"s": sid, "u": uid, "du": delta, "bu": balance, "r": reason, "t": now}, separators=(",", ":")) + "\n"
+            for sid, uid, delta, balance, reason in entries
+        )
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write(lines)
+        self._file.flush()
+        self.records += len(entries)
+
+    def replay(self, data):
+        """Applies every journaled balance on top of a snapshot. Returns the accounts touched."""
+        touched = {}
+        # Rotated journals are only left behind if a compaction didn't finish; their records come first.
+        for path in self._rotated_files():
+            self._replay_file(path, data, touched)
+        self.records = self._replay_file(self.path, data, touched)
+        return touched
+
+    def _replay_file(self, path, data, touched):
+        if not os.path.exists(path):
+            return 0
+        count = 0
+        good_bytes = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A crash mid-append leaves a torn last line; it is cut off below so new appends start clean.
+                    print(f"Warning: dropping torn record at the end of {path}.")
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Warning: skipping damaged record in {path}.")
+                else:
+                    # Records written before fixed-point balances carry "b" in diamonds instead of "bu".
+                    units = record["bu"] if "bu" in record else to_units(record["b"])
+                    data.setdefault(record["s"], {})[record["u"]] = units
+                    touched.setdefault(record["s"], set()).add(record["u"])
+                    count += 1
+                good_bytes += len(line)
+        if good_bytes < os.path.getsize(path):
+            os.truncate(path, good_bytes)
+        return count
+
+    def truncate(self):
+        """Empties the journal once a snapshot containing all its records has been written."""
+        self.close()
+        open(self.path, "w").close()
+        self.discard_rotated()
+        self.records = 0
+
+    def rotate(self):
+        """
+        Sets the current records aside before a background snapshot, so appends made while
+        the snapshot is being written land in a fresh journal and survive the compaction.
+        Always a rename, so it's cheap enough for the event loop: if an earlier compaction
+        failed, its rotated files stay and ours is numbered after them.
+        """
+        self.close()
+        if os.path.exists(self.path):
+            rotated = len(self._rotated_files())
+            os.replace(self.path, f"{self.rotated_path}.{rotated}" if rotated else self.rotated_path)
+        self.records = 0
+
+    def _rotated_files(self):
+        """The rotated journals left on disk, oldest first."""
+        paths = []
+        path = self.rotated_path
+        while os.path.exists(path):
+            paths.append(path)
+            path = f"{self.rotated_path}.{len(paths)}"
+        return paths
+
+    def discard_rotated(self):
+        """Drops the rotated records once the snapshot that contains them is safely written."""
+        for path in self._rotated_files():
+            os.remove(path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+# --- In-Memory Ledger ---
+class InsufficientDiamonds(Exception):
+    """Raised when a batch would take an account below zero. Nothing in the batch is applied. Amounts are in diamonds."""
+    def __init__(self, player_id: str, balance, needed):
+        super().__init__(f"Player {player_id} has {balance} diamonds but needs {needed}.")
+        self.player_id = player_id
+        self.balance = balance
+        self.needed = needed
+
+class BankLedger:
+    """
+    Keeps every balance in memory and writes back to the storage engine only when something changed.
+    All amounts here are integer milli-diamonds; the module-level functions convert at the boundary.
+    """
+    def __init__(self, storage=None, journal=None):
+        self.storage = storage or JsonBankStorage()
+        self.journal = journal or BankJournal()
+        self.data = None
+        self.dirty_servers = {}  # server_id -> set of changed player_ids
+        self.updates = 0          # Balance changes since startup
+        self.journal_appends = 0  # Journal writes (one per update or batch)
+        self.flushes = 0          # Snapshot writes to storage
+        self._flush_task = None
+        self._compact_requested = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self.leaderboard = LeaderboardIndex()
+
+    def _load(self):
+        if self.data is None:
+            self._set_loaded(*self._read_storage())
+        return self.data
+
+    def _read_storage(self):
+        data = self.storage.load()
+        # Changes journaled after the last snapshot are not in storage yet.
+        return data, self.journal.replay(data)
+
+    def _set_loaded(self, data, touched):
+        self.data = data
+        for server_id, players in touched.items():
+            self.dirty_servers.setdefault(server_id, set()).update(players)
+
+    async def load_async(self):
+        """Loads storage and replays the journal on the I/O pool instead of on the first command."""
+        if self.data is None:
+            loaded = await run_blocking(self._read_storage)
+            if self.data is None:
+                self._set_loaded(*loaded)
+
+    def get_server(self, server_id: str):
+        """Returns the {player_id: units} dict for a server (created if missing)."""
+        return self._load().setdefault(server_id, {})
+
+    def get(self, server_id: str, player_id: str):
+        server = self.get_server(server_id)
+        if player_id not in server or server[player_id] <= 0:
+            delta = STARTING_UNITS - server.get(player_id, 0)
+            server[player_id] = STARTING_UNITS
+            self.record([(server_id, player_id, delta)], "starting_diamonds")
+        return server[player_id]
+
+    def update(self, server_id: str, player_id: str, amount, reason: str = ""):
+        server = self.get_server(server_id)
+        server[player_id] = server.get(player_id, STARTING_UNITS) + amount
+        self.record([(server_id, player_id, amount)], reason)
+        return server[player_id]
+
+    def apply_batch_now(self, server_id: str, changes, reason: str = ""):
+        """
+        Applies [(player_id, amount), ...] as one unit: every change lands or none does.
+        Raises InsufficientDiamonds if the debits would take an account below zero.
+
+        There is no await between the balance check and the writes, so on the event loop
+        no other command can change these balances in between; no locking is needed.
+        """
+        net = {}
+        for player_id, amount in changes:
+            net[player_id] = net.get(player_id, 0) + amount
+        for player_id, amount in net.items():
+            if amount < 0:
+                balance = self.get(server_id, player_id)
+                if balance + amount < 0:
+                    raise InsufficientDiamonds(player_id, from_units(balance), from_units(-amount))
+        server = self.get_server(server_id)
+        for player_id, amount in net.items():
+            server[player_id] = server.get(player_id, STARTING_UNITS) + amount
+        self.record([(server_id, player_id, amount) for player_id, amount in net.items()], reason)
+        return {player_id: server[player_id] for player_id in net}
+
+    def credit_many(self, credits, reason: str = ""):
+        """Applies {(server_id, player_id): units} credits across any number of servers with a single journal write."""
+        for (server_id, player_id), amount in credits.items():
+            server = self.get_server(server_id)
+            server[player_id] = server.get(player_id, STARTING_UNITS) + amount
+        self.record([(server_id, player_id, amount) for (server_id, player_id), amount in credits.items()], reason)
+
+    def record(self, changes, reason: str):
+        """Journals [(server_id, player_id, delta), ...] just applied in memory in one write and marks the accounts dirty."""
+        data = self.data
+        self.journal.append([(server_id, player_id, delta, data[server_id][player_id], reason) for server_id, player_id, delta in changes])
+        for server_id, player_id, _ in changes:
+            self.dirty_servers.setdefault(server_id, set()).add(player_id)
+            self.leaderboard.update(server_id, player_id, data[server_id][player_id])
+        self.updates += len(changes)
+        self.journal_appends += 1
+        if self.journal.records >= JOURNAL_COMPACT_RECORDS:
+            self._compact_requested.set()
+
+    def set_storage(self, make_storage):
+        """
+        Switches storage engine, flushing pending changes to the old one first. Takes the
+        engine's factory rather than an engine, because a new engine may import the old
+        one's files as it's built and must see those changes.
+        """
+        self.flush()
+        self.storage.close()
+        self.storage = make_storage()
+        self.data = None
+        self.leaderboard.clear()
+
+    def _indexed_leaderboard(self, server_id: str):
+        if not self.leaderboard.is_indexed(server_id):
+            self.leaderboard.build(server_id, self.get_server(server_id))
+        return self.leaderboard
+
+    def top(self, server_id: str, k: int = 10):
+        return self._indexed_leaderboard(server_id).top(server_id, k)
+
+    def rank(self, server_id: str, player_id: str):
+        return self._indexed_leaderboard(server_id).rank(server_id, player_id)
+
+    def flush(self):
+        """Writes changed balances to storage (a snapshot) and compacts the journal. Returns True if a write happened."""
+        if not self.dirty_servers:
+            return False
+        dirty, self.dirty_servers = self.dirty_servers, {}
+        try:
+            self.storage.save(self.data, dirty)
+        except Exception:
+            self._requeue(dirty)
+            raise
+        self.journal.truncate()
+        self._compact_requested.clear()
+        self.flushes += 1
+        return True
+
+    async def flush_async(self):
+        """Like flush(), but the storage write runs on the I/O pool so the event loop keeps serving commands."""
+        async with self._flush_lock:
+            if not self.dirty_servers:
+                return False
+            dirty, self.dirty_servers = self.dirty_servers, {}
+            payload = self.storage.prepare(self.data, dirty)
+            self.journal.rotate()
+            self._compact_requested.clear()
+            try:
+                await run_blocking(self.storage.write, payload)
+            except Exception:
+                self._requeue(dirty)
+                raise
+            self.journal.discard_rotated()
+            self.flushes += 1
+            return True
+
+    def _requeue(self, dirty):
+        # Keep the changes queued so the next flush retries them.
+        for server_id, players in dirty.items():
+            self.dirty_servers.setdefault(server_id, set()).update(players)
+
+    def stats(self):
+        data = self._load()
+        return {
+            "backend": self.storage.name,
+            "servers": len(data),
+            "accounts": sum(len(players) for players in data.values()),
+            "dirty_servers": len(self.dirty_servers),
+            "dirty_accounts": sum(len(players) for players in self.dirty_servers.values()),
+            "updates": self.updates,
+            "journal_appends": self.journal_appends,
+            "snapshot_flushes": self.flushes,
+            "journal_records": self.journal.records,
+        }
+
+    def start_autoflush(self, interval: float = FLUSH_INTERVAL_SECONDS):
+        """Starts the background flush timer on the running event loop (safe to call twice)."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._autoflush_loop(interval))
+
+    async def _autoflush_loop(self, interval: float):
+        while True:
+            # Flush on the timer, or sooner if the journal has grown enough to slow down replay.
+            try:
+                await asyncio.wait_for(self._compact_requested.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush_async()
+            except Exception as e:
+                print(f"Failed to flush bank: {e}")
+
+bank_ledger = BankLedger()
+atexit.register(bank_ledger.flush)
+
+def configure_bank(backend: str = "json"):
+    """Selects the storage engine ("json" or "sqlite"); call before the bank is first used."""
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown bank backend '{backend}'. Choose from: {', '.join(STORAGE_BACKENDS)}")
+    if bank_ledger.storage.name != backend:
+        bank_ledger.set_storage(STORAGE_BACKENDS[backend])
+
+def get_server_balances(server_id: str):
+    """Returns a {player_id: diamonds} snapshot for a server."""
+    return {player_id: from_units(units) for player_id, units in bank_ledger.get_server(server_id).items()}
+
+def get_top_players(server_id: str, k: int = 10):
+    """Returns [(player_id, diamonds), ...] for the k richest players in a server, richest first."""
+    return [(player_id, from_units(units)) for player_id, units in bank_ledger.top(server_id, k)]
+
+def get_player_rank(server_id: str, player_id: str):
+    """Returns (rank, total_players) for a player in a server, or None if they have no account there."""
+    return bank_ledger.rank(server_id, player_id)
 
 def get_player_diamonds(server_id: str, player_id: str):
     """Gets or initializes a player's diamonds for a specific server."""
-    bank_data = load_bank_data()
-
-    if server_id not in bank_data:
-        bank_data[server_id] = {}
+    return from_units(bank_ledger.get(server_id, player_id))
 
-    if player_id not in bank_data[server_id] or bank_data[server_id][player_id] <= 0:
-        bank_data[server_id][player_id] = STARTING_DIAMONDS
-        save_bank_data(bank_data)
+def update_player_diamonds(server_id: str, player_id: str, amount: int, reason: str = ""):
+    """Updates a player's diamond balance in a specific server. `reason` is recorded in the journal."""
+    bank_ledger.update(server_id, player_id, to_units(amount), reason)
 
-    return bank_data[server_id][player_id]
+def credit_players(credits, reason: str = ""):
+    """Credits {(server_id, player_id): diamonds} in one go (a single journal write for the whole batch)."""
+    if credits:
+        bank_ledger.credit_many({key: to_units(amount) for key, amount in credits.items()}, reason)
 
-def update_player_diamonds(server_id: str, player_id: str, amount: int):
-    """Updates a player's diamond balance in a specific server."""
-    bank_data = load_bank_data()
+def apply_batch(server_id: str, changes, reason: str = ""):
+    """
+    Atomically applies [(player_id, amount), ...] in one server with a single journal write.
+    Returns {player_id: new_balance}; raises InsufficientDiamonds (applying nothing) if a debit can't be covered.
+    It's a plain function: with no await between checking balances and changing them, no other
+    command can run in between.
+    """
+    new_balances = bank_ledger.apply_batch_now(server_id, [(player_id, to_units(amount)) for player_id, amount in changes], reason)
+    return {player_id: from_units(units) for player_id, units in new_balances.items()}
 
-    if server_id not in bank_data:
-        bank_data[server_id] = {}
+def transfer(server_id: str, from_player_id: str, to_player_id: str, amount, reason: str = ""):
+    """Moves diamonds between two players, failing with InsufficientDiamonds if the sender can't cover it."""
+    return apply_batch(server_id, [(from_player_id, -amount), (to_player_id, amount)], reason)
 
-    bank_data[server_id][player_id] = bank_data[server_id].get(player_id, STARTING_DIAMONDS) + amount
-    save_bank_data(bank_data)
\ No newline at end of file
+def get_bank_stats():
+    """Returns ledger counters: accounts held, balance updates, journal appends and snapshot flushes."""
+    return bank_ledger.stats()
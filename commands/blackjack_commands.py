@@ -1,9 +1,15 @@
 from .bank import load_bank_data, save_bank_data, get_player_diamonds, update_player_diamonds
+from .blackjack_odds import BASIC_STRATEGY, solve
+from .blackjack_shoe import Shoe, create_shoe_registry, DEFAULT_DECKS, DEFAULT_PENETRATION
+from .blackjack_games import open_games, OPEN_GAME_IDLE_SECONDS
+from .metrics import LatencyHistogram, format_latency
 import discord
 from discord.ext import commands
 from discord import app_commands
+from array import array
 import random
 import asyncio
+import time
 
 # --- Card Definitions and Game Logic ---
 
@@ -14,52 +20,122 @@ CARD_VALUES = {
 }
 RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
 SUITS = ['♠️', '♥️', '♦️', '♣️']  # Using emojis for suits for better display
+SHOE_FILE = "data/blackjack_shoes.json"
+
+# Cards are ints 0-51: rank index * 4 + suit index. Lookups by card replace string parsing.
+DECK_SIZE = len(RANKS) * len(SUITS)
+CARD_RANKS = [RANKS[card // len(SUITS)] for card in range(DECK_SIZE)]
+CARD_POINTS = bytes(CARD_VALUES[rank] for rank in CARD_RANKS)
+CARD_LABELS = [f"{CARD_RANKS[card]}{SUITS[card % len(SUITS)]}" for card in range(DECK_SIZE)]
+FULL_DECK = array('B', range(DECK_SIZE))
+
+class Hand:
+    """Cards in a hand plus a running total, kept up to date as cards are added."""
+    __slots__ = ("cards", "total", "soft_aces")
 
-class BlackjackGame:
-    """Manages the state and logic of a single Blackjack game."""
     def __init__(self):
-        self.deck = self._create_deck()
-        self.player_hand = []
-        self.dealer_hand = []
+        self.cards = bytearray()
+        self.total = 0
+        self.soft_aces = 0  # Aces still counted as 11
+
+    def add(self, card: int):
+        self.cards.append(card)
+        points = CARD_POINTS[card]
+        self.total += points
+        if points == 11:
+            self.soft_aces += 1
+        while self.total > 21 and self.soft_aces:
+            self.total -= 10
+            self.soft_aces -= 1
+
+    @classmethod
+    def from_cards(cls, cards):
+        hand = cls()
+        for card in cards:
+            if card >= DECK_SIZE:
+                raise ValueError(f"not a card: {card}")
+            hand.add(card)
+        return hand
+
+    @property
+    def soft(self):
+        return self.soft_aces > 0
+
+    def __len__(self):
+        return len(self.cards)
+
+class BlackjackGame:
+    """Manages the state and logic of a single Blackjack game, dealt from a table's shoe or its own deck."""
+    def __init__(self, shoe: Shoe = None):
+        self.shoe = shoe
+        self.deck = None if shoe else self._create_deck()
+        self.player_hand = Hand()
+        self.dealer_hand = Hand()
         self.game_over = False
         self.result = ""  # Stores the final outcome of the game
 
     def _create_deck(self):
-        """Creates and shuffles a standard 52-card deck."""
-        deck = [(rank, suit) for rank in RANKS for suit in SUITS]
-        random.shuffle(deck)
-        return deck
+        """Creates a standard 52-card deck. It's shuffled lazily, one card per deal."""
+        return array('B', FULL_DECK)
 
     def _deal_card(self, hand):
-        """Deals a single card from the deck to the given hand."""
+        """Deals the next card of the shoe, or a uniformly random card from the deck (a Fisher-Yates step)."""
+        if self.shoe:
+            hand.add(self.shoe.deal())
+            return
         if not self.deck:
             self.deck = self._create_deck()
-        hand.append(self.deck.pop())
+        deck = self.deck
+        i = random.randrange(len(deck))
+        deck[i], deck[-1] = deck[-1], deck[i]
+        hand.add(deck.pop())
 
     def calculate_hand_value(self, hand):
-        """Calculates the value of a hand, correctly handling Aces."""
-        value = 0
-        num_aces = 0
-        for rank, _ in hand:
-            value += CARD_VALUES[rank]
-            if rank == 'A':
-                num_aces += 1
-        while value > 21 and num_aces > 0:
-            value -= 10
-            num_aces -= 1
-        return value
+        """Value of a hand, with aces counted as 1 where 11 would bust."""
+        return hand.total
+
+    def get_hint(self):
+        """Basic-strategy action and hit/stand EVs for the player's hand against the dealer's upcard."""
+        total, soft = self.player_hand.total, self.player_hand.soft
+        upcard = CARD_POINTS[self.dealer_hand.cards[0]]
+        return BASIC_STRATEGY[(total, soft, upcard)], solve(total, soft, upcard)
 
     def start_game(self):
         """Initializes the game by dealing two cards to player and dealer."""
-        self.player_hand = []
-        self.dealer_hand = []
+        self.player_hand = Hand()
+        self.dealer_hand = Hand()
         self.game_over = False
         self.result = ""
+        if self.shoe:
+            self.shoe.begin_hand()
         self._deal_card(self.player_hand)
         self._deal_card(self.dealer_hand)
         self._deal_card(self.player_hand)
         self._deal_card(self.dealer_hand)
 
+    def check_naturals(self):
+        """Ends the game on the deal if either side has blackjack. Returns True if it did."""
+        player_value = self.calculate_hand_value(self.player_hand)
+        dealer_value = self.calculate_hand_value(self.dealer_hand)
+        if player_value == 21 and dealer_value == 21:
+            self.result = "Both have Blackjack! It's a push."
+        elif player_value == 21:
+            self.result = "Blackjack! Player wins!"
+        elif dealer_value == 21:
+            self.result = "Dealer has Blackjack! Dealer wins."
+        else:
+            return False
+        self.game_over = True
+        return True
+
+    def payout(self, bet_amount):
+        """Diamonds returned to the player once the game is over: the bet doubled on a win, the bet back on a push."""
+        if "Player wins" in self.result:
+            return bet_amount * 2
+        if "It's a push" in self.result:
+            return bet_amount
+        return 0
+
     def player_hit(self):
         """Adds a card to the player's hand and checks for bust."""
         self._deal_card(self.player_hand)
@@ -86,14 +162,15 @@ class BlackjackGame:
 
     def get_hand_display(self, hand, hide_second_dealer_card=False):
         if hide_second_dealer_card and len(hand) == 2:
-            return f"{hand[0][0]}{hand[0][1]} and one face down card"
-        return " ".join([f"{rank}{suit}" for rank, suit in hand])
+            return f"{CARD_LABELS[hand.cards[0]]} and one face down card"
+        return " ".join([CARD_LABELS[card] for card in hand.cards])
+
+    def get_player_hand_field(self):
+        return f"{self.get_hand_display(self.player_hand)} (Value: {self.calculate_hand_value(self.player_hand)})"
 
     def get_game_state_embed(self, show_dealer_full_hand=False, player_diamonds=None, bet_amount=None):
         embed = discord.Embed(title="♠️♥️♦️♣️ Blackjack! ♣️♦️♥️♠️", color=discord.Color.blue())
-        player_cards_display = self.get_hand_display(self.player_hand)
-        player_value = self.calculate_hand_value(self.player_hand)
-        embed.add_field(name="Your Hand", value=f"{player_cards_display} (Value: {player_value})", inline=False)
+        embed.add_field(name="Your Hand", value=self.get_player_hand_field(), inline=False)
         if show_dealer_full_hand:
             dealer_cards_display = self.get_hand_display(self.dealer_hand)
             dealer_value = self.calculate_hand_value(self.dealer_hand)
@@ -120,68 +197,255 @@ class BlackjackGame:
 
 # --- Discord UI View for Buttons ---
 
+EDIT_INTERVAL_SECONDS = 1.0  # At most one message edit per game in this window; faster clicks are coalesced
+
+live_views = {}  # game_id -> BlackjackView, for the games in open_games
+click_latency = LatencyHistogram()  # Button press to the message edit showing its result being sent
+edit_stats = {"sent": 0, "coalesced": 0}
+
+def get_blackjack_stats():
+    return {
+        "open_games": len(open_games.games),
+        "click_latency": click_latency.summary(),
+        "edits_sent": edit_stats["sent"],
+        "edits_coalesced": edit_stats["coalesced"],
+    }
+
+def game_message(client, state):
+    """A partial message for a saved game's message, editable without fetching it first."""
+    return client.get_partial_messageable(int(state["channel"])).get_partial_message(int(state["message"]))
+
 class BlackjackView(discord.ui.View):
-    def __init__(self, game: BlackjackGame, original_interaction: discord.Interaction, server_id: str, player_id: str, bet_amount: int):
-        super().__init__(timeout=180)
+    """
+    Buttons for one open game. Persistent (no timeout, fixed custom_ids) so it can be
+    re-attached to its message after a restart; idle games are timed out by expire_idle_games.
+    """
+    def __init__(self, game: BlackjackGame, game_id: str, server_id: str, player_id: str, bet_amount: int, balance):
+        super().__init__(timeout=None)
         self.game = game
-        self.original_interaction = original_interaction
-        self.game_message = None
+        self.game_id = game_id
         self.server_id = server_id
         self.player_id = player_id
         self.bet_amount = bet_amount
+        self.balance = balance  # Shown in the embed; kept up to date with the payout instead of re-read from the bank
+        self.embed = None       # Last embed sent; mid-game clicks only change the player's hand field
+        self._pending_edit = None  # Interaction to send the next coalesced edit through
+        self._pending_clicks = []  # perf_counter() times of the clicks the next edit will show
+        self._edit_task = None
+        self._last_edit = 0.0
 
-    async def on_timeout(self):
-        if self.game_message:
-            for item in self.children:
-                item.disabled = True
-            await self.game_message.edit(content="Game timed out! Please start a new game.", view=self)
+    @classmethod
+    def restore(cls, game_id: str, state: dict, shoes):
+        game = BlackjackGame(shoes.get(state["table"]))
+        game.player_hand = Hand.from_cards(bytes.fromhex(state["player_cards"]))
+        game.dealer_hand = Hand.from_cards(bytes.fromhex(state["dealer_cards"]))
+        balance = get_player_diamonds(state["server"], state["player"])
+        return cls(game, game_id, state["server"], state["player"], state["bet"], balance)
+
+    def record(self, table: str, channel_id: int):
+        """The compact state saved in open_games."""
+        return {
+            "server": self.server_id,
+            "player": self.player_id,
+            "channel": str(channel_id),
+            "message": None,
+            "table": table,
+            "bet": self.bet_amount,
+            "player_cards": self.game.player_hand.cards.hex(),
+            "dealer_cards": self.game.dealer_hand.cards.hex(),
+            "shoe": self.game.shoe.to_dict(),
+        }
 
-    async def update_game_message(self, show_dealer_full_hand=False):
-        current_diamonds = get_player_diamonds(self.server_id, self.player_id)
-        embed = self.game.get_game_state_embed(show_dealer_full_hand, player_diamonds=current_diamonds, bet_amount=self.bet_amount)
-        if self.game_message:
-            await self.game_message.edit(embed=embed, view=self if not self.game.game_over else None)
+    def is_open(self):
+        """False once the game has been settled or timed out (a late click must not settle it again)."""
+        return not self.game.game_over and self.game_id in open_games.games
+
+    def render(self, show_dealer_full_hand=False):
+        if self.embed is None or self.game.game_over:
+            self.embed = self.game.get_game_state_embed(show_dealer_full_hand, player_diamonds=self.balance, bet_amount=self.bet_amount)
+        else:
+            self.embed.set_field_at(0, name="Your Hand", value=self.game.get_player_hand_field(), inline=False)
+
+    async def update_game_message(self, interaction: discord.Interaction, show_dealer_full_hand=False, clicked_at: float = None):
+        """
+        Renders the game and queues an edit. Edits are sent at most once per EDIT_INTERVAL_SECONDS, always with the latest state.
+        `clicked_at` is the perf_counter() time of the button press, timed until the edit showing it has been sent.
+        """
+        self.render(show_dealer_full_hand)
+        self._pending_edit = interaction
+        if clicked_at is not None:
+            self._pending_clicks.append(clicked_at)
+        if self._edit_task is None or self._edit_task.done():
+            self._edit_task = asyncio.get_running_loop().create_task(self._send_edits())
         else:
-            await self.original_interaction.followup.send(embed=embed, view=self if not self.game.game_over else None)
+            edit_stats["coalesced"] += 1
+
+    async def _send_edits(self):
+        while self._pending_edit is not None:
+            delay = self._last_edit + EDIT_INTERVAL_SECONDS - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            interaction, self._pending_edit = self._pending_edit, None
+            clicks, self._pending_clicks = self._pending_clicks, []
+            self._last_edit = time.monotonic()
+            edit_stats["sent"] += 1
+            try:
+                await interaction.edit_original_response(embed=self.embed, view=self if not self.game.game_over else None)
+            except discord.HTTPException as e:
+                print(f"Failed to update blackjack game {self.game_id}: {e}")
+                continue
+            sent_at = time.perf_counter()
+            for clicked_at in clicks:
+                click_latency.observe(sent_at - clicked_at)
 
     async def finalize_game_outcome(self):
-        if "Player wins" in self.game.result:
-            update_player_diamonds(self.server_id, self.player_id, self.bet_amount * 2)
-        elif "It's a push" in self.game.result:
-            update_player_diamonds(self.server_id, self.player_id, self.bet_amount)
+        returned = self.game.payout(self.bet_amount)
+        # Saved as settled before paying, so a crash in between can't get the game resumed and paid twice
+        await open_games.update(self.game_id, settled=True)
+        if returned:
+            update_player_diamonds(self.server_id, self.player_id, returned, "blackjack")
+            self.balance += returned
+        live_views.pop(self.game_id, None)
+        await open_games.remove(self.game_id)
+
+    async def finish(self, interaction: discord.Interaction, clicked_at: float = None):
+        await self.finalize_game_outcome()
+        for item in self.children:
+            item.disabled = True
+        await self.update_game_message(interaction, show_dealer_full_hand=True, clicked_at=clicked_at)
+        self.stop()
 
-    @discord.ui.button(label="Hit", style=discord.ButtonStyle.green, emoji="➕")
+    @discord.ui.button(label="Hit", style=discord.ButtonStyle.green, emoji="➕", custom_id="blackjack:hit")
     async def hit_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         if str(interaction.user.id) != self.player_id:
             await interaction.response.send_message("This isn't your game!", ephemeral=True)
             return
+        start = time.perf_counter()
         await interaction.response.defer()
+        if not self.is_open():
+            return
         self.game.player_hit()
         if self.game.game_over:
-            await self.finalize_game_outcome()
-            for item in self.children:
-                item.disabled = True
-            await self.update_game_message(show_dealer_full_hand=True)
-            self.stop()
+            await self.finish(interaction, clicked_at=start)
         else:
-            await self.update_game_message()
+            await open_games.update(self.game_id, player_cards=self.game.player_hand.cards.hex(), shoe=self.game.shoe.to_dict())
+            await self.update_game_message(interaction, clicked_at=start)
 
-    @discord.ui.button(label="Stand", style=discord.ButtonStyle.red, emoji="🛑")
+    @discord.ui.button(label="Stand", style=discord.ButtonStyle.red, emoji="🛑", custom_id="blackjack:stand")
     async def stand_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         if str(interaction.user.id) != self.player_id:
             await interaction.response.send_message("This isn't your game!", ephemeral=True)
             return
+        start = time.perf_counter()
         await interaction.response.defer()
+        if not self.is_open():
+            return
         self.game.dealer_play()
-        await self.finalize_game_outcome()
-        for item in self.children:
-            item.disabled = True
-        await self.update_game_message(show_dealer_full_hand=True)
-        self.stop()
+        await self.finish(interaction, clicked_at=start)
+
+    @discord.ui.button(label="Hint", style=discord.ButtonStyle.blurple, emoji="💡", custom_id="blackjack:hint")
+    async def hint_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if str(interaction.user.id) != self.player_id:
+            await interaction.response.send_message("This isn't your game!", ephemeral=True)
+            return
+        # The buttons can stay clickable for a moment after the game ends (edits are coalesced)
+        if not self.is_open():
+            await interaction.response.send_message("This game is over!", ephemeral=True)
+            return
+        action, odds = self.game.get_hint()
+        await interaction.response.send_message(
+            f"💡 Basic strategy says **{action.title()}**.\n"
+            f"Expected result per 💎 bet: stand {odds.stand_ev:+.2f}, hit {odds.hit_ev:+.2f}. "
+            f"The dealer busts {odds.dealer_bust:.0%} of the time from here.",
+            ephemeral=True
+        )
+
+# --- Open Games Across Restarts ---
+
+async def refund_game(client, game_id: str, state: dict):
+    """Gives back the bet of a game that can't be resumed and tells the player on its message."""
+    await open_games.update(game_id, settled=True)  # As in finalize_game_outcome: never refunded twice
+    update_player_diamonds(state["server"], state["player"], state["bet"], "blackjack_refund")
+    await open_games.remove(game_id)
+    if state.get("message"):
+        try:
+            await game_message(client, state).edit(
+                content=f"The bot restarted during this game, so your bet of 💎 {state['bet']} was refunded.", view=None)
+        except discord.HTTPException as e:
+            print(f"Couldn't update refunded blackjack game {game_id}: {e}")
+
+async def expire_idle_games(client, interval: float = 30):
+    """Times out games nobody has pressed a button in for OPEN_GAME_IDLE_SECONDS. The bet is lost, as before."""
+    while True:
+        await asyncio.sleep(interval)
+        for game_id in open_games.idle():
+            state = open_games.games[game_id]
+            view = live_views.pop(game_id, None)
+            await open_games.remove(game_id)
+            if view is None or not state.get("message"):
+                continue
+            view.stop()
+            for item in view.children:
+                item.disabled = True
+            try:
+                await game_message(client, state).edit(content="Game timed out! Please start a new game.", view=view)
+            except discord.HTTPException as e:
+                print(f"Couldn't update timed out blackjack game {game_id}: {e}")
+
+_restored = False
+
+async def restore_open_games(client, shoes):
+    """
+    Call from on_ready: re-attaches the buttons of games that were open before a restart,
+    refunds the ones that can't be resumed, and starts timing out idle games.
+    """
+    global _restored
+    if _restored:
+        return
+    _restored = True
+    now = time.time()
+    saved_games = await open_games.load()
+    # The shoe checkpoint can be up to SHOE_SAVE_SECONDS old; the games' own copies may be newer
+    resumed_tables = set()
+    for game_id, state in saved_games.items():
+        try:
+            if "shoe" in state and shoes.resume(state["table"], state["shoe"]):
+                resumed_tables.add(state["table"])
+        except (KeyError, ValueError) as e:
+            print(f"Couldn't restore the shoe of blackjack game {game_id}: {e}")
+    # Hands finished after the newest copy are lost, and their cards are still ahead in the shoe;
+    # shuffling what's left keeps them from coming out again in an order players have already seen
+    for table in resumed_tables:
+        shoes.shoes[table].shuffle_remaining()
+    for game_id, state in list(saved_games.items()):
+        if state.get("settled"):
+            # Paid or refunded just before the restart; only the removal didn't make it to disk
+            await open_games.remove(game_id)
+            continue
+        if state.get("message") and now - state["updated"] < OPEN_GAME_IDLE_SECONDS:
+            try:
+                view = BlackjackView.restore(game_id, state, shoes)
+                client.add_view(view, message_id=int(state["message"]))
+                live_views[game_id] = view
+                continue
+            except (KeyError, ValueError) as e:
+                print(f"Couldn't restore blackjack game {game_id}: {e}")
+        await refund_game(client, game_id, state)
+    print(f"Blackjack: resumed {len(live_views)} open games.")
+    asyncio.get_running_loop().create_task(expire_idle_games(client))
 
 # --- Setup Function for the Bot ---
 
-def setup_blackjack_commands(tree: app_commands.CommandTree):
+def setup_blackjack_commands(tree: app_commands.CommandTree, config: dict):
+    """Registers the blackjack commands and returns the shoe registry (start its autosave in on_ready)."""
+    # Optional config keys: "blackjack_decks", "blackjack_penetration", and "blackjack_shoe_scope" ("channel" or "guild")
+    shoes = create_shoe_registry(SHOE_FILE, config.get("blackjack_decks", DEFAULT_DECKS),
+                                 config.get("blackjack_penetration", DEFAULT_PENETRATION))
+    shoe_scope = config.get("blackjack_shoe_scope", "channel")
+
+    def table_key(interaction: discord.Interaction):
+        return str(interaction.guild.id if shoe_scope == "guild" else interaction.channel_id)
+
     @tree.command(name="blackjack", description="Start a game of Blackjack!")
     @app_commands.describe(bet="The amount of diamonds you want to bet.")
     async def blackjack(interaction: discord.Interaction, bet: int):
@@ -199,37 +463,54 @@ def setup_blackjack_commands(tree: app_commands.CommandTree):
         if bet > current_diamonds:
             await interaction.response.send_message(f"You don't have enough diamonds! You have 💎 {current_diamonds}.", ephemeral=True)
             return
+        if open_games.is_full():
+            await interaction.response.send_message("All the blackjack tables are busy right now. Try again in a few minutes!", ephemeral=True)
+            return
 
-        update_player_diamonds(server_id, player_id, -bet)
+        update_player_diamonds(server_id, player_id, -bet, "blackjack")
         initial_display_diamonds = get_player_diamonds(server_id, player_id)
-        game = BlackjackGame()
+        table = table_key(interaction)
+        game = BlackjackGame(shoes.get(table))
         game.start_game()
 
-        player_value = game.calculate_hand_value(game.player_hand)
-        dealer_value = game.calculate_hand_value(game.dealer_hand)
-
-        if player_value == 21 and dealer_value == 21:
-            game.result = "Both have Blackjack! It's a push."
-            game.game_over = True
-            update_player_diamonds(server_id, player_id, bet)
-            embed = game.get_game_state_embed(show_dealer_full_hand=True, player_diamonds=get_player_diamonds(server_id, player_id), bet_amount=bet)
-            await interaction.response.send_message(embed=embed)
-            return
-        elif player_value == 21:
-            game.result = "Blackjack! Player wins!"
-            game.game_over = True
-            update_player_diamonds(server_id, player_id, bet * 2)
-            embed = game.get_game_state_embed(show_dealer_full_hand=True, player_diamonds=get_player_diamonds(server_id, player_id), bet_amount=bet)
-            await interaction.response.send_message(embed=embed)
-            return
-        elif dealer_value == 21:
-            game.result = "Dealer has Blackjack! Dealer wins."
-            game.game_over = True
+        if game.check_naturals():
+            returned = game.payout(bet)
+            if returned:
+                update_player_diamonds(server_id, player_id, returned, "blackjack")
             embed = game.get_game_state_embed(show_dealer_full_hand=True, player_diamonds=get_player_diamonds(server_id, player_id), bet_amount=bet)
             await interaction.response.send_message(embed=embed)
             return
 
-        view = BlackjackView(game, interaction, server_id, player_id, bet)
-        embed = game.get_game_state_embed(player_diamonds=initial_display_diamonds, bet_amount=bet)
-        await interaction.response.send_message(embed=embed, view=view)
-        view.game_message = await interaction.original_response()
+        # Saved before the message exists: if the bot dies in between, the bet is refunded on restart
+        game_id = str(interaction.id)
+        view = BlackjackView(game, game_id, server_id, player_id, bet, initial_display_diamonds)
+        await open_games.put(game_id, view.record(table, interaction.channel_id))
+        live_views[game_id] = view
+        view.render()
+        await interaction.response.send_message(embed=view.embed, view=view)
+        message = await interaction.original_response()
+        await open_games.update(game_id, message=str(message.id))
+
+    @tree.command(name="shoe", description="Shows the state of this table's blackjack shoe")
+    async def shoe(interaction: discord.Interaction):
+        stats = shoes.get(table_key(interaction)).stats()
+        embed = discord.Embed(title="🃏 Blackjack Shoe 🃏", color=discord.Color.blue())
+        embed.add_field(name="Decks", value=stats["decks"], inline=True)
+        embed.add_field(name="Cards Left", value=f"{stats['cards_remaining']} ({stats['cards_until_cut']} before the cut card)", inline=True)
+        embed.add_field(name="Hands Dealt", value=stats["hands_dealt"], inline=True)
+        embed.add_field(name="Reshuffles", value=stats["reshuffles"], inline=True)
+        await interaction.response.send_message(embed=embed)
+
+    @tree.command(name="blackjack_stats", description="Shows blackjack button latency and message edit statistics.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def blackjack_stats(interaction: discord.Interaction):
+        stats = get_blackjack_stats()
+        embed = discord.Embed(title="🃏 Blackjack Stats 🃏", color=discord.Color.blue())
+        embed.add_field(name="Button press to message updated", value=format_latency(stats["click_latency"]), inline=False)
+        embed.add_field(name="Message edits",
+                        value=f"{stats['edits_sent']} sent, {stats['edits_coalesced']} clicks folded into a later edit",
+                        inline=False)
+        embed.add_field(name="Open games", value=stats["open_games"], inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    return shoes
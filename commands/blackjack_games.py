@@ -0,0 +1,66 @@
+import atexit
+import time
+from .async_io import read_json_async, JsonPersister
+
+# --- Constants ---
+OPEN_GAMES_FILE = "data/blackjack_games.json"
+MAX_OPEN_GAMES = 500            # New games are refused beyond this, which bounds memory and file size
+OPEN_GAME_IDLE_SECONDS = 180    # A game with no button press for this long times out
+
+class OpenGameRegistry:
+    """
+    Blackjack games that have taken a bet but aren't settled yet, saved to disk after
+    every action so a restart can pick them up again (or refund them).
+
+    Each game is a small dict of plain values: ids, the bet, the table its shoe belongs
+    to, both hands as hex-encoded card bytes, the time of the last action and a copy of
+    the table's shoe as of that action (so a restart never deals from a shoe older than
+    the game). Nothing references Discord objects, so an open game costs about 1 KB.
+    """
+    def __init__(self, path: str = OPEN_GAMES_FILE, max_games: int = MAX_OPEN_GAMES):
+        self.path = path
+        self.max_games = max_games
+        self.games = {}  # game_id -> state dict
+        self.persister = JsonPersister(path, self.snapshot, name="open blackjack games")
+
+    async def load(self):
+        """Reads the saved games on the I/O pool and returns them. Games started while it was reading are kept."""
+        saved = await read_json_async(self.path)
+        for game_id, state in saved.items():
+            self.games.setdefault(game_id, state)
+        return saved
+
+    def is_full(self):
+        return len(self.games) >= self.max_games
+
+    async def put(self, game_id: str, state: dict):
+        """Adds or replaces a game's state and saves the registry before returning."""
+        state["updated"] = time.time()
+        self.games[game_id] = state
+        await self.save()
+
+    async def update(self, game_id: str, **fields):
+        state = self.games.get(game_id)
+        if state is None:
+            return
+        state.update(fields, updated=time.time())
+        await self.save()
+
+    async def remove(self, game_id: str):
+        if self.games.pop(game_id, None) is not None:
+            await self.save()
+
+    def idle(self, now: float = None, idle_seconds: float = OPEN_GAME_IDLE_SECONDS):
+        """Ids of games with no action in the last idle_seconds."""
+        cutoff = (time.time() if now is None else now) - idle_seconds
+        return [game_id for game_id, state in self.games.items() if state["updated"] < cutoff]
+
+    def snapshot(self):
+        return {game_id: dict(state) for game_id, state in self.games.items()}
+
+    async def save(self):
+        self.persister.mark_dirty()
+        await self.persister.save_async()
+
+open_games = OpenGameRegistry()
+atexit.register(open_games.persister.save)  # Retries a save that failed, if there was one
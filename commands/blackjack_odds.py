@@ -0,0 +1,131 @@
+"""
+Dealer outcome probabilities and hit/stand EV for /blackjack.
+
+Cards are treated as drawn from an infinite shoe (each rank 1/13, tens 4/13),
+so a hand only matters through its total and whether an ace still counts as 11.
+That keeps the state space tiny: the dealer's final-total distribution is a DP
+over (total, soft), and the player's EV is a DP over (total, soft, upcard)
+whose results sit in an LRU, so hints after warm-up are a dictionary lookup.
+
+The rules match BlackjackGame: the dealer stands on all 17s, wins pay 1:1, and
+by the time the player acts the dealer is known not to have blackjack.
+
+Print the basic-strategy chart with:
+    python -m commands.blackjack_odds
+"""
+import functools
+from collections import namedtuple
+
+# --- Constants ---
+DEALER_STANDS_ON = 17
+CARD_PROBABILITIES = {value: 1 / 13 for value in range(2, 10)}
+CARD_PROBABILITIES[10] = 4 / 13  # 10, J, Q, K
+CARD_PROBABILITIES[11] = 1 / 13  # Ace
+DEALER_OUTCOMES = (17, 18, 19, 20, 21, "bust")
+UPCARDS = tuple(range(2, 12))  # Ace is 11
+SOLVER_CACHE_SIZE = 1024  # Well above the ~400 reachable (total, soft, upcard) states
+
+Hint = namedtuple("Hint", ["action", "stand_ev", "hit_ev", "dealer_bust"])
+
+def add_card(total: int, soft: bool, card: int):
+    """(total, soft) after drawing `card` (2-11), counting an ace as 1 whenever 11 would bust."""
+    if card == 11 and total + 11 > 21:
+        card = 1
+    total += card
+    soft = soft or card == 11
+    if total > 21 and soft:
+        total -= 10
+        soft = False
+    return total, soft
+
+def hand_state(card_values):
+    """(total, soft) of a hand given its card values, the same total calculate_hand_value gives."""
+    total, soft = 0, False
+    for card in card_values:
+        total, soft = add_card(total, soft, card)
+    return total, soft
+
+# --- Dealer ---
+@functools.lru_cache(maxsize=None)
+def _dealer_final(total: int, soft: bool):
+    """Probabilities of each DEALER_OUTCOMES entry for a dealer currently on (total, soft)."""
+    if total > 21:
+        return (0.0,) * 5 + (1.0,)
+    if total >= DEALER_STANDS_ON:
+        return tuple(1.0 if outcome == total else 0.0 for outcome in DEALER_OUTCOMES)
+    result = [0.0] * len(DEALER_OUTCOMES)
+    for card, p in CARD_PROBABILITIES.items():
+        for i, q in enumerate(_dealer_final(*add_card(total, soft, card))):
+            result[i] += p * q
+    return tuple(result)
+
+@functools.lru_cache(maxsize=None)
+def dealer_distribution(upcard: int):
+    """Final-total distribution for a dealer showing `upcard`, given they don't have blackjack."""
+    hole_cards = {
+        card: p for card, p in CARD_PROBABILITIES.items()
+        if not (upcard == 11 and card == 10) and not (upcard == 10 and card == 11)
+    }
+    norm = sum(hole_cards.values())
+    result = [0.0] * len(DEALER_OUTCOMES)
+    for card, p in hole_cards.items():
+        for i, q in enumerate(_dealer_final(*add_card(upcard, upcard == 11, card))):
+            result[i] += p / norm * q
+    return dict(zip(DEALER_OUTCOMES, result))
+
+# --- Player ---
+def stand_ev(total: int, upcard: int):
+    """Expected net per unit bet of standing on `total`."""
+    if total > 21:
+        return -1.0
+    ev = 0.0
+    for outcome, p in dealer_distribution(upcard).items():
+        if outcome == "bust" or total > outcome:
+            ev += p
+        elif total < outcome:
+            ev -= p
+    return ev
+
+@functools.lru_cache(maxsize=SOLVER_CACHE_SIZE)
+def solve(total: int, soft: bool, upcard: int):
+    """Best action and the EV of both actions for a player on (total, soft) against `upcard`."""
+    standing = stand_ev(total, upcard)
+    hitting = 0.0
+    for card, p in CARD_PROBABILITIES.items():
+        new_total, new_soft = add_card(total, soft, card)
+        if new_total > 21:
+            hitting -= p
+        else:
+            after = solve(new_total, new_soft, upcard)
+            hitting += p * max(after.stand_ev, after.hit_ev)
+    action = "hit" if hitting > standing else "stand"
+    return Hint(action, standing, hitting, dealer_distribution(upcard)["bust"])
+
+def clear_caches():
+    for cached in (_dealer_final, dealer_distribution, solve):
+        cached.cache_clear()
+
+# --- Basic Strategy ---
+def build_basic_strategy():
+    """{(total, soft, upcard): "hit" | "stand"} for every hand a player can act on."""
+    table = {}
+    for upcard in UPCARDS:
+        for total in range(4, 22):
+            table[(total, False, upcard)] = solve(total, False, upcard).action
+        for total in range(12, 22):
+            table[(total, True, upcard)] = solve(total, True, upcard).action
+    return table
+
+BASIC_STRATEGY = build_basic_strategy()
+
+def format_basic_strategy(table=BASIC_STRATEGY):
+    upcard_labels = [str(upcard) if upcard < 11 else "A" for upcard in UPCARDS]
+    lines = ["Hand  " + " ".join(f"{label:>2}" for label in upcard_labels)]
+    for soft in (False, True):
+        for total in range(12 if soft else 4, 22):
+            label = f"{'S' if soft else 'H'}{total}"
+            lines.append(f"{label:<5} " + " ".join(f"{table[(total, soft, upcard)][0].upper():>2}" for upcard in UPCARDS))
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    print(format_basic_strategy())
@@ -0,0 +1,212 @@
+import atexit
+import random
+import time
+from array import array
+from collections import OrderedDict
+from .async_io import read_json, JsonPersister
+
+# --- Constants ---
+DECK_SIZE = 52
+DEFAULT_DECKS = 6
+DEFAULT_PENETRATION = 0.75          # Share of the shoe dealt before the cut card comes out
+MAX_SHOES = 1000                    # Most shoes kept in memory (least recently used go first)
+SHOE_IDLE_SECONDS = 24 * 60 * 60    # Shoes nobody dealt from in a day are dropped
+SHOE_SAVE_SECONDS = 60              # How often changed shoes are checkpointed
+
+class Shoe:
+    """
+    An N-deck blackjack shoe with a cut card. Cards are ints 0-51 (see blackjack_commands),
+    shuffled once into an array and dealt by position. The shoe is only reshuffled when a
+    new hand starts after the cut card has come out, like at a real table.
+    """
+    def __init__(self, decks: int = DEFAULT_DECKS, penetration: float = DEFAULT_PENETRATION):
+        self.decks = decks
+        self.penetration = penetration
+        self.cards = array('B', range(DECK_SIZE)) * decks
+        self.position = 0
+        self.cut_card = int(len(self.cards) * penetration)
+        self.hands_dealt = 0
+        self.cards_dealt = 0
+        self.reshuffles = 0
+        self.last_used = time.time()
+        self.shuffle()
+
+    def shuffle(self):
+        random.shuffle(self.cards)
+        self.position = 0
+        self.reshuffles += 1
+
+    def shuffle_remaining(self):
+        """Shuffles only the cards not dealt yet, leaving the position (and the cards on the table) alone."""
+        rest = list(self.cards[self.position:])
+        random.shuffle(rest)
+        self.cards[self.position:] = array('B', rest)
+
+    def begin_hand(self):
+        """Call before dealing a new hand: reshuffles if the cut card has been reached."""
+        if self.position >= self.cut_card:
+            self.shuffle()
+        self.hands_dealt += 1
+
+    def deal(self):
+        if self.position >= len(self.cards):  # Only possible with the cut card at 100%
+            self.shuffle()
+        card = self.cards[self.position]
+        self.position += 1
+        self.cards_dealt += 1
+        return card
+
+    @property
+    def remaining(self):
+        return len(self.cards) - self.position
+
+    def stats(self):
+        return {
+            "decks": self.decks,
+            "cards_remaining": self.remaining,
+            "cards_until_cut": max(0, self.cut_card - self.position),
+            "hands_dealt": self.hands_dealt,
+            "cards_dealt": self.cards_dealt,
+            "reshuffles": self.reshuffles,
+        }
+
+    # --- Persistence ---
+    def to_dict(self):
+        return {
+            "decks": self.decks,
+            "penetration": self.penetration,
+            "cards": self.cards.tobytes().hex(),
+            "position": self.position,
+            "hands_dealt": self.hands_dealt,
+            "cards_dealt": self.cards_dealt,
+            "reshuffles": self.reshuffles,
+            "last_used": self.last_used,
+        }
+
+    @classmethod
+    def from_dict(cls, saved):
+        shoe = cls.__new__(cls)
+        shoe.decks = saved["decks"]
+        shoe.penetration = saved["penetration"]
+        shoe.cards = array('B', bytes.fromhex(saved["cards"]))
+        if len(shoe.cards) != shoe.decks * DECK_SIZE:
+            raise ValueError(f"saved shoe has {len(shoe.cards)} cards, expected {shoe.decks * DECK_SIZE}")
+        shoe.position = saved["position"]
+        shoe.cut_card = int(len(shoe.cards) * shoe.penetration)
+        shoe.hands_dealt = saved["hands_dealt"]
+        shoe.cards_dealt = saved["cards_dealt"]
+        shoe.reshuffles = saved["reshuffles"]
+        shoe.last_used = saved["last_used"]
+        return shoe
+
+class ShoeRegistry:
+    """
+    Shoes by table key (a channel or guild id). Kept in least-recently-used order, so
+    idle shoes are dropped from the front and the registry never holds more than
+    max_shoes. Shoes are checkpointed to disk so a restart keeps each table's shoe.
+    """
+    def __init__(self, path: str = None, decks: int = DEFAULT_DECKS, penetration: float = DEFAULT_PENETRATION,
+                 max_shoes: int = MAX_SHOES, idle_seconds: float = SHOE_IDLE_SECONDS):
+        self.path = path
+        self.decks = decks
+        self.penetration = penetration
+        self.max_shoes = max_shoes
+        self.idle_seconds = idle_seconds
+        self.shoes = OrderedDict()  # key -> Shoe, least recently used first
+        self.evicted = 0
+        self._saved_dealt = 0       # Cards dealt across all shoes at the last checkpoint
+        # Marked dirty when shoes are added or dropped; deals are picked up by changed()
+        self.persister = JsonPersister(path, self.snapshot, changed=self.changed, name="blackjack shoes")
+        if path:
+            self.load()
+
+    def get(self, key: str):
+        """The shoe for a table, created on first use."""
+        self.purge()
+        shoe = self.shoes.get(key)
+        if shoe is None:
+            shoe = self.shoes[key] = Shoe(self.decks, self.penetration)
+            while len(self.shoes) > self.max_shoes:
+                self.shoes.popitem(last=False)
+                self.evicted += 1
+        else:
+            self.shoes.move_to_end(key)
+        shoe.last_used = time.time()
+        self.persister.mark_dirty()
+        return shoe
+
+    def resume(self, key: str, saved: dict):
+        """
+        After a restart: puts back a table's shoe as an open game last saved it, if that is further
+        along than the checkpoint (which is only written every SHOE_SAVE_SECONDS). Returns whether it did.
+        """
+        shoe = Shoe.from_dict(saved)
+        current = self.shoes.get(key)
+        if shoe.decks != self.decks or shoe.penetration != self.penetration:
+            return False
+        if current is not None and current.cards_dealt >= shoe.cards_dealt:
+            return False
+        self.shoes[key] = shoe
+        self.shoes.move_to_end(key)
+        self.persister.mark_dirty()
+        return True
+
+    def purge(self, now: float = None):
+        """Drops shoes that have been idle for longer than idle_seconds."""
+        cutoff = (time.time() if now is None else now) - self.idle_seconds
+        while self.shoes:
+            key, shoe = next(iter(self.shoes.items()))
+            if shoe.last_used > cutoff:
+                break
+            del self.shoes[key]
+            self.evicted += 1
+            self.persister.mark_dirty()
+
+    # --- Persistence ---
+    def load(self):
+        saved = read_json(self.path)
+        shoes = []
+        for key, data in saved.items():
+            try:
+                shoe = Shoe.from_dict(data)
+            except (KeyError, ValueError) as e:
+                print(f"Skipping saved blackjack shoe {key}: {e}")
+                continue
+            # A shoe saved under different settings is replaced by a fresh one on next use
+            if shoe.decks == self.decks and shoe.penetration == self.penetration:
+                shoes.append((shoe.last_used, key, shoe))
+        self.shoes = OrderedDict((key, shoe) for _, key, shoe in sorted(shoes, key=lambda entry: entry[0]))
+        self.purge()
+        self._saved_dealt = self._cards_dealt()
+
+    def _cards_dealt(self):
+        return sum(shoe.cards_dealt for shoe in self.shoes.values())
+
+    def changed(self):
+        """Whether any cards were dealt since the last checkpoint."""
+        return self._cards_dealt() != self._saved_dealt
+
+    def snapshot(self):
+        self.purge()
+        self._saved_dealt = self._cards_dealt()
+        return {key: shoe.to_dict() for key, shoe in self.shoes.items()}
+
+    def save(self):
+        self.persister.save()
+
+    def start_autosave(self, interval: float = SHOE_SAVE_SECONDS):
+        self.persister.start_autosave(interval)
+
+    def stats(self):
+        return {
+            "shoes": len(self.shoes),
+            "evicted": self.evicted,
+            "hands_dealt": sum(shoe.hands_dealt for shoe in self.shoes.values()),
+            "reshuffles": sum(shoe.reshuffles for shoe in self.shoes.values()),
+        }
+
+def create_shoe_registry(path: str = None, decks: int = DEFAULT_DECKS, penetration: float = DEFAULT_PENETRATION):
+    """Creates a shoe registry with a final checkpoint at shutdown."""
+    registry = ShoeRegistry(path, decks, penetration)
+    atexit.register(registry.save)
+    return registry
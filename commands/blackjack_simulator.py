@@ -0,0 +1,120 @@
+"""
+Monte Carlo house edge of /blackjack under a fixed player policy.
+
+Hands are played by BlackjackGame itself (check_naturals, player_hit,
+dealer_play, payout), dealt from a Shoe like a live table, so the simulator
+follows the game's rules: the dealer stands on all 17s, a win (natural or not)
+returns 2x the bet, and there is no double or split. Work is split into chunks
+played in parallel worker processes, each with its own shoe and seed.
+
+Policies:
+    basic   hit/stand basic strategy from blackjack_odds
+    stand   never hit
+    mimic   play like the dealer (hit below 17)
+
+Run from the repository root:
+    python -m commands.blackjack_simulator --hands 10000000 --policy basic
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from .blackjack_commands import BlackjackGame, CARD_POINTS
+from .blackjack_odds import BASIC_STRATEGY, DEALER_STANDS_ON
+from .blackjack_shoe import Shoe, DEFAULT_DECKS, DEFAULT_PENETRATION
+
+CHUNK_HANDS = 250_000  # Hands per worker task
+
+def basic_policy(game):
+    hand = game.player_hand
+    return BASIC_STRATEGY[(hand.total, hand.soft, CARD_POINTS[game.dealer_hand.cards[0]])] == "hit"
+
+def stand_policy(game):
+    return False
+
+def mimic_dealer_policy(game):
+    return game.player_hand.total < DEALER_STANDS_ON
+
+POLICIES = {"basic": basic_policy, "stand": stand_policy, "mimic": mimic_dealer_policy}
+
+def play_chunk(task):
+    """Plays `hands` hands and returns (hands, net total, wins, pushes, losses, player naturals)."""
+    hands, policy_name, decks, penetration, seed = task
+    random.seed(seed)
+    policy = POLICIES[policy_name]
+    shoe = Shoe(decks, penetration) if decks else None
+    net = wins = pushes = losses = naturals = 0
+    for _ in range(hands):
+        game = BlackjackGame(shoe)
+        game.start_game()
+        if game.check_naturals():
+            naturals += game.player_hand.total == 21
+        else:
+            while policy(game):
+                game.player_hit()
+                if game.game_over:
+                    break
+            game.dealer_play()
+        returned = game.payout(1)
+        if returned == 2:
+            wins += 1
+        elif returned == 1:
+            pushes += 1
+        else:
+            losses += 1
+        net += returned - 1
+    return hands, net, wins, pushes, losses, naturals
+
+def simulate(hands: int, policy: str = "basic", decks: int = DEFAULT_DECKS, penetration: float = DEFAULT_PENETRATION,
+             seed: int = None, processes: int = None):
+    """Plays `hands` hands at a bet of 1 across worker processes and returns the edge with a 95% CI."""
+    base_seed = random.SystemRandom().randrange(2 ** 32) if seed is None else seed
+    tasks = []
+    for i, start in enumerate(range(0, hands, CHUNK_HANDS)):
+        tasks.append((min(CHUNK_HANDS, hands - start), policy, decks, penetration, base_seed + i))
+
+    totals = [0] * 6
+    with multiprocessing.Pool(processes or os.cpu_count()) as pool:
+        for result in pool.imap_unordered(play_chunk, tasks):
+            totals = [total + value for total, value in zip(totals, result)]
+    played, net, wins, pushes, losses, naturals = totals
+
+    # Each hand nets +1, 0 or -1, so E[net^2] is the share of hands that weren't pushes
+    mean = net / played
+    variance = (wins + losses) / played - mean ** 2
+    std_error = (variance / played) ** 0.5
+    return {
+        "hands": played,
+        "policy": policy,
+        "house_edge": -mean,
+        "ci95": 1.96 * std_error,
+        "win_rate": wins / played,
+        "push_rate": pushes / played,
+        "loss_rate": losses / played,
+        "natural_rate": naturals / played,
+        "seed": base_seed,
+    }
+
+def print_report(result, elapsed: float):
+    print(f"Hands:       {result['hands']:,} ({result['policy']} policy) in {elapsed:.1f}s ({result['hands'] / elapsed:,.0f} hands/s)")
+    print(f"House edge:  {result['house_edge']:.4%} ± {result['ci95']:.4%} (95% CI)")
+    print(f"Win / push / loss: {result['win_rate']:.2%} / {result['push_rate']:.2%} / {result['loss_rate']:.2%}")
+    print(f"Player naturals:   {result['natural_rate']:.2%}")
+    print(f"Seed:        {result['seed']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo house edge for /blackjack.")
+    parser.add_argument("--hands", type=int, default=10_000_000)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="basic")
+    parser.add_argument("--decks", type=int, default=DEFAULT_DECKS, help="Decks in the shoe (0 = a fresh deck every hand)")
+    parser.add_argument("--penetration", type=float, default=DEFAULT_PENETRATION)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    result = simulate(args.hands, args.policy, args.decks, args.penetration, args.seed, args.processes)
+    print_report(result, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
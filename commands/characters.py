@@ -0,0 +1,109 @@
+import atexit
+import bisect
+from .async_io import read_json, JsonPersister
+
+# --- Constants ---
+CHARACTERS_PATH = "data/characters.json"
+CHARACTER_SUFFIX = "_desc"          # Characters are stored as "<name>_desc": <personality prompt>
+CHARACTER_SAVE_DELAY_SECONDS = 2.0  # Changes made within this window are written to disk together
+MAX_AUTOCOMPLETE_CHOICES = 25       # Discord rejects autocomplete responses with more choices
+
+# Default characters for a new server
+DEFAULT_CHARACTERS = {
+    "bot_desc": "answer this question in a funny way and less than 1600 characters : "
+}
+
+def character_name(key: str):
+    """The lowercase name autocomplete matches against ("Bot_desc" -> "bot")."""
+    return (key[:-len(CHARACTER_SUFFIX)] if key.endswith(CHARACTER_SUFFIX) else key).lower()
+
+class CharacterStore:
+    """
+    Every server's characters, read from disk once and then served from memory.
+
+    Next to each server's {key: prompt} dict sits a sorted list of its character
+    names, so autocomplete finds prefix matches with a binary search and only falls
+    back to a substring scan to fill the remaining choices. Adding or deleting a
+    character updates both in place and schedules a save; saves are delayed by
+    save_delay so a burst of changes costs one write.
+    """
+    def __init__(self, path: str = CHARACTERS_PATH, save_delay: float = CHARACTER_SAVE_DELAY_SECONDS):
+        self.path = path
+        self.characters = {}  # guild_id -> {key: prompt}
+        self.names = {}       # guild_id -> sorted character names
+        self.persister = JsonPersister(path, self.snapshot, delay=save_delay, name="characters")
+        self.load()
+
+    def get(self, guild_id):
+        """A server's characters (don't modify the dict, use add/delete). New servers get the defaults."""
+        gid = str(guild_id)
+        chars = self.characters.get(gid)
+        if chars is None:
+            chars = self.characters[gid] = DEFAULT_CHARACTERS.copy()
+            self.names[gid] = sorted(character_name(key) for key in chars)
+            self.persister.schedule()
+        return chars
+
+    def add(self, guild_id, key: str, prompt: str):
+        """Adds or replaces a character."""
+        chars = self.get(guild_id)
+        if key not in chars:
+            bisect.insort(self.names[str(guild_id)], character_name(key))
+        chars[key] = prompt
+        self.persister.schedule()
+
+    def delete(self, guild_id, key: str):
+        """Removes a character and returns its prompt, or None if there was no such character."""
+        chars = self.get(guild_id)
+        prompt = chars.pop(key, None)
+        if prompt is not None:
+            names = self.names[str(guild_id)]
+            names.pop(bisect.bisect_left(names, character_name(key)))
+            self.persister.schedule()
+        return prompt
+
+    def complete(self, guild_id, current: str, limit: int = MAX_AUTOCOMPLETE_CHOICES):
+        """Up to `limit` character names for autocomplete: names starting with `current` first, then ones containing it."""
+        names = self.names.get(str(guild_id))
+        if names is None:
+            self.get(guild_id)
+            names = self.names[str(guild_id)]
+        current = current.lower()
+        start = bisect.bisect_left(names, current)
+        matches = []
+        for name in names[start:start + limit]:
+            if not name.startswith(current):
+                break
+            matches.append(name)
+        if len(matches) < limit and current:
+            prefixed = set(matches)
+            for name in names:
+                if current in name and name not in prefixed:
+                    matches.append(name)
+                    if len(matches) == limit:
+                        break
+        return matches
+
+    # --- Persistence ---
+    def load(self):
+        self.characters = read_json(self.path)
+        self.names = {gid: sorted(character_name(key) for key in chars) for gid, chars in self.characters.items()}
+
+    def snapshot(self):
+        return {gid: dict(chars) for gid, chars in self.characters.items()}
+
+    def save(self):
+        self.persister.save()
+
+    def stats(self):
+        return {
+            "servers": len(self.characters),
+            "characters": sum(len(chars) for chars in self.characters.values()),
+            "unsaved_changes": self.persister.dirty,
+        }
+
+def create_character_store(path: str = CHARACTERS_PATH):
+    """Creates a character store; changes still waiting for their delayed save are written at shutdown."""
+    store = CharacterStore(path)
+    atexit.register(store.save)
+    return store
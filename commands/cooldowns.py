@@ -0,0 +1,81 @@
+import atexit
+import time
+from collections import OrderedDict
+from .async_io import read_json, JsonPersister
+
+# --- Constants ---
+COOLDOWN_SAVE_SECONDS = 60  # How often changed cooldowns are written to disk
+MAX_COOLDOWN_ENTRIES = 100_000
+
+class CooldownStore:
+    """
+    Per-key cooldowns (e.g. one reward per user every 5 minutes) that expire on their own.
+
+    Every key gets the same duration, so keeping keys in the order they were last set
+    also keeps them in expiry order: check-and-set is O(1) and expired keys are
+    dropped from the front. Memory is bounded by the keys active within one cooldown
+    window (and hard-capped at max_entries). Expiry times are wall-clock, so the
+    store can be saved to disk and survive restarts.
+    """
+    def __init__(self, cooldown_seconds: float, path: str = None, max_entries: int = MAX_COOLDOWN_ENTRIES):
+        self.cooldown = cooldown_seconds
+        self.path = path
+        self.max_entries = max_entries
+        self.expiries = OrderedDict()  # key -> expires_at, soonest first
+        self.persister = JsonPersister(path, self.snapshot, name="cooldowns")
+        if path:
+            self.load()
+
+    def try_acquire(self, key: str, now: float = None):
+        """Starts the key's cooldown and returns True if it wasn't cooling down, else returns False."""
+        now = time.time() if now is None else now
+        self.purge(now)
+        if key in self.expiries:
+            return False
+        self.expiries[key] = now + self.cooldown
+        if len(self.expiries) > self.max_entries:
+            self.expiries.popitem(last=False)
+        self.persister.mark_dirty()
+        return True
+
+    def remaining(self, key: str, now: float = None):
+        """Seconds left on the key's cooldown (0 if it's free)."""
+        now = time.time() if now is None else now
+        return max(0.0, self.expiries.get(key, now) - now)
+
+    def purge(self, now: float = None):
+        """Drops every expired key. Amortised O(1) per key, since keys only expire once."""
+        now = time.time() if now is None else now
+        expiries = self.expiries
+        while expiries:
+            key, expires_at = next(iter(expiries.items()))
+            if expires_at > now:
+                break
+            del expiries[key]
+            self.persister.mark_dirty()
+
+    # --- Persistence ---
+    def load(self):
+        saved = read_json(self.path)
+        now = time.time()
+        active = sorted((expires_at, key) for key, expires_at in saved.items() if expires_at > now)
+        self.expiries = OrderedDict((key, expires_at) for expires_at, key in active)
+
+    def snapshot(self):
+        self.purge()
+        return dict(self.expiries)
+
+    def save(self):
+        self.persister.save()
+
+    def start_autosave(self, interval: float = COOLDOWN_SAVE_SECONDS):
+        self.persister.start_autosave(interval)
+
+    def stats(self):
+        return {"active": len(self.expiries), "cooldown_seconds": self.cooldown}
+
+def create_cooldown_store(cooldown_seconds: float, path: str = None):
+    """Creates a cooldown store that is saved at shutdown too, not just by its autosave."""
+    store = CooldownStore(cooldown_seconds, path)
+    atexit.register(store.save)
+    return store
@@ -0,0 +1,297 @@
+"""
+Async, concurrency-limited access to the Gemini model for /ask.
+
+Requests wait in one FIFO queue per guild and are started round-robin across
+guilds, so a busy server can't starve the others. At most max_in_flight calls
+run at once, and every request has a deadline: if it's still queued it is
+dropped, and if it's running its task is cancelled. stream() hands the answer
+over chunk by chunk as the model produces it, so the caller can show the start
+of it long before generation ends.
+
+Try it offline against the fake model (simulated latency, no API key):
+    python -m commands.gemini_client --requests 60 --guilds 4 [--stream]
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from .metrics import LatencyHistogram
+
+# --- Constants ---
+MAX_IN_FLIGHT = 4                # Gemini calls running at once, across all guilds
+MAX_QUEUED_PER_GUILD = 10        # Waiting requests per guild before new ones are turned away
+REQUEST_TIMEOUT_SECONDS = 60     # Queue wait + generation; the /ask followup token lasts 15 minutes
+
+# Blocking SDK calls get their own threads: a call that timed out keeps its thread until the SDK
+# returns, and on the shared I/O pool a few of those would hold up bank and JSON writes
+sdk_executor = ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT, thread_name_prefix="gemini-sdk")
+
+async def run_sdk_call(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(sdk_executor, func, *args)
+
+class GeminiBusy(Exception):
+    """Raised when a guild already has MAX_QUEUED_PER_GUILD requests waiting."""
+
+class GeminiTimeout(Exception):
+    """Raised when a request misses its deadline (queued or generating)."""
+
+class _Request:
+    __slots__ = ("prompt", "deadline", "enqueued_at", "future", "on_text", "task")
+
+    def __init__(self, prompt, deadline: float, enqueued_at: float, future, on_text=None):
+        self.prompt = prompt
+        self.deadline = deadline
+        self.enqueued_at = enqueued_at
+        self.future = future
+        self.on_text = on_text  # Streaming requests only: called with the text so far after each chunk
+        self.task = None        # Set once the request is running
+
+def _chunk_text(chunk):
+    # A chunk without text parts (e.g. one that only carries the finish reason) raises on .text
+    try:
+        return chunk.text or ""
+    except ValueError:
+        return ""
+
+class GeminiClient:
+    """
+    Wraps a genai.GenerativeModel (or anything with generate_content /
+    generate_content_async). Uses the SDK's async API when the model has one and
+    sdk_executor otherwise; a cancelled executor call stops being waited on, but
+    its thread finishes in the background.
+    """
+    def __init__(self, model, max_in_flight: int = MAX_IN_FLIGHT, max_queued_per_guild: int = MAX_QUEUED_PER_GUILD,
+                 timeout: float = REQUEST_TIMEOUT_SECONDS):
+        self.model = model
+        self.max_in_flight = max_in_flight
+        self.max_queued_per_guild = max_queued_per_guild
+        self.timeout = timeout
+        self.in_flight = 0
+        self.queues = OrderedDict()  # guild_id -> deque of waiting requests; the front guild goes next
+        self.queue_wait = LatencyHistogram()
+        self.generation_time = LatencyHistogram()
+        self.first_chunk_time = LatencyHistogram()  # Streaming: from being queued to the first text arriving
+        self.completed = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.rejected = 0
+
+    async def generate(self, guild_id, prompt, timeout: float = None):
+        """Queues a prompt for the guild and returns the model's response, or raises GeminiBusy/GeminiTimeout."""
+        return await self._submit(guild_id, prompt, timeout)
+
+    async def stream(self, guild_id, prompt, on_text, timeout: float = None):
+        """
+        Like generate(), but streams the answer: on_text(text_so_far) is called after every chunk
+        and the full text is returned. The deadline covers the whole stream.
+        """
+        return await self._submit(guild_id, prompt, timeout, on_text)
+
+    async def _submit(self, guild_id, prompt, timeout: float = None, on_text=None):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        queue = self.queues.get(guild_id)
+        if queue is None:
+            queue = self.queues[guild_id] = deque()
+        if len(queue) >= self.max_queued_per_guild:
+            self.rejected += 1
+            raise GeminiBusy(f"{len(queue)} questions are already waiting in this server.")
+        request = _Request(prompt, now + (timeout or self.timeout), now, loop.create_future(), on_text)
+        queue.append(request)
+        self._dispatch()
+        try:
+            # shield: a timeout here must not cancel the future itself, _cancel cleans up instead
+            return await asyncio.wait_for(asyncio.shield(request.future), request.deadline - loop.time())
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._cancel(guild_id, request)
+            raise GeminiTimeout(f"No answer within {timeout or self.timeout:g}s.")
+        except asyncio.CancelledError:
+            self._cancel(guild_id, request)
+            raise
+
+    def _dispatch(self):
+        """Starts queued requests, one guild at a time in turn, until max_in_flight are running."""
+        loop = asyncio.get_running_loop()
+        while self.in_flight < self.max_in_flight and self.queues:
+            guild_id, queue = next(iter(self.queues.items()))
+            request = queue.popleft()
+            if queue:
+                self.queues.move_to_end(guild_id)
+            else:
+                del self.queues[guild_id]
+            self.in_flight += 1
+            request.task = loop.create_task(self._run(request))
+
+    def _cancel(self, guild_id, request: _Request):
+        if request.task is not None:
+            request.task.cancel()
+            return
+        queue = self.queues.get(guild_id)
+        if queue is not None and request in queue:
+            queue.remove(request)
+            if not queue:
+                del self.queues[guild_id]
+
+    async def _run(self, request: _Request):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self.queue_wait.observe(start - request.enqueued_at)
+        try:
+            if request.on_text is None:
+                response = await self._call(request.prompt)
+            else:
+                response = await self._call_stream(request)
+            self.generation_time.observe(loop.time() - start)
+            self.completed += 1
+            if not request.future.done():
+                request.future.set_result(response)
+        except asyncio.CancelledError:
+            pass  # Deadline passed or the caller went away; generate() already counted it
+        except Exception as e:
+            self.errors += 1
+            if not request.future.done():
+                request.future.set_exception(e)
+        finally:
+            self.in_flight -= 1
+            self._dispatch()
+
+    async def _call(self, prompt):
+        generate_async = getattr(self.model, "generate_content_async", None)
+        if generate_async is not None:
+            return await generate_async(prompt)
+        return await run_sdk_call(self.model.generate_content, prompt)
+
+    async def _call_stream(self, request: _Request):
+        loop = asyncio.get_running_loop()
+        parts = []
+
+        def receive(text):
+            if not text or request.task.done():
+                return
+            if not parts:
+                self.first_chunk_time.observe(loop.time() - request.enqueued_at)
+            parts.append(text)
+            request.on_text("".join(parts))
+
+        generate_async = getattr(self.model, "generate_content_async", None)
+        if generate_async is not None:
+            response = await generate_async(request.prompt, stream=True)
+            async for chunk in response:
+                receive(_chunk_text(chunk))
+        else:
+            # The sync SDK blocks between chunks, so the stream is read on sdk_executor
+            # and each chunk is handed back to the event loop
+            def consume():
+                for chunk in self.model.generate_content(request.prompt, stream=True):
+                    loop.call_soon_threadsafe(receive, _chunk_text(chunk))
+            await run_sdk_call(consume)
+            await asyncio.sleep(0)  # Let the last call_soon_threadsafe callbacks run
+        return "".join(parts)
+
+    def stats(self):
+        return {
+            "in_flight": self.in_flight,
+            "queued": sum(len(queue) for queue in self.queues.values()),
+            "guilds_waiting": len(self.queues),
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "queue_wait": self.queue_wait.summary(),
+            "generation_time": self.generation_time.summary(),
+            "time_to_first_chunk": self.first_chunk_time.summary(),
+        }
+
+# --- Offline Testing ---
+FakeResponse = namedtuple("FakeResponse", ["text"])
+
+class FakeGeminiModel:
+    """
+    Stand-in for genai.GenerativeModel that answers after a simulated latency, for offline runs.
+    With stream=True the answer arrives word by word, spread over the same latency.
+    """
+    def __init__(self, latency: float = 2.0, jitter: float = 0.5, fail_rate: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.calls = 0
+
+    def _answer(self, prompt):
+        self.calls += 1
+        if random.random() < self.fail_rate:
+            raise RuntimeError("simulated Gemini error")
+        return FakeResponse(f"(fake answer #{self.calls} to: {prompt[-60:]})")
+
+    def _delay(self):
+        return max(0.0, random.uniform(self.latency - self.jitter, self.latency + self.jitter))
+
+    def _chunks(self, prompt):
+        words = self._answer(prompt).text.split(" ")
+        return [FakeResponse(word + " ") for word in words], self._delay() / len(words)
+
+    async def generate_content_async(self, prompt, stream: bool = False, **kwargs):
+        if stream:
+            return self._stream_async(prompt)
+        await asyncio.sleep(self._delay())
+        return self._answer(prompt)
+
+    async def _stream_async(self, prompt):
+        chunks, delay = self._chunks(prompt)
+        for chunk in chunks:
+            await asyncio.sleep(delay)
+            yield chunk
+
+    def generate_content(self, prompt, stream: bool = False, **kwargs):
+        if stream:
+            return self._stream(prompt)
+        time.sleep(self._delay())
+        return self._answer(prompt)
+
+    def _stream(self, prompt):
+        chunks, delay = self._chunks(prompt)
+        for chunk in chunks:
+            time.sleep(delay)
+            yield chunk
+
+async def _load_test(requests: int, guilds: int, latency: float, timeout: float, max_in_flight: int, stream: bool):
+    client = GeminiClient(FakeGeminiModel(latency=latency, jitter=latency / 4), max_in_flight=max_in_flight, timeout=timeout)
+    finished = {}
+
+    async def ask(i: int):
+        # The first guild floods the queue; the others ask now and then
+        guild_id = 0 if i % 2 == 0 or guilds == 1 else 1 + (i // 2) % (guilds - 1)
+        try:
+            prompt = f"question {i} from guild {guild_id}"
+            if stream:
+                await client.stream(guild_id, prompt, lambda text: None)
+            else:
+                await client.generate(guild_id, prompt)
+            outcome = "ok"
+        except (GeminiBusy, GeminiTimeout) as e:
+            outcome = type(e).__name__
+        finished.setdefault(guild_id, []).append(outcome)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(ask(i) for i in range(requests)))
+    print(f"{requests} requests from {guilds} guilds in {time.perf_counter() - start:.1f}s")
+    for guild_id, outcomes in sorted(finished.items()):
+        print(f"  guild {guild_id}: " + ", ".join(f"{outcomes.count(o)} {o}" for o in sorted(set(outcomes))))
+    for key, value in client.stats().items():
+        print(f"  {key}: {value}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test of GeminiClient against a fake model.")
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--guilds", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated seconds per generation")
+    parser.add_argument("--timeout", type=float, default=5.0)
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT)
+    parser.add_argument("--stream", action="store_true", help="Stream the answers and report time to first chunk")
+    args = parser.parse_args()
+    asyncio.run(_load_test(args.requests, args.guilds, args.latency, args.timeout, args.max_in_flight, args.stream))
+
+if __name__ == "__main__":
+    main()
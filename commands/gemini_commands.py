@@ -1,89 +1,187 @@
 from .bank import get_player_diamonds, update_player_diamonds
+from .characters import create_character_store, character_name
+from .gemini_client import GeminiClient, GeminiBusy, GeminiTimeout
+from .response_cache import create_response_cache
+from .metrics import LatencyHistogram, format_latency
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
+import asyncio
+import time
 
-CHARACTERS_PATH = "data/characters.json"
-
-# Default characters for a new server
-DEFAULT_CHARACTERS = {
-    "bot_desc": "answer this question in a funny way and less than 1600 characters : "
-}
+ASK_CACHE_PATH = "data/ask_cache.json"
 
 # ------------------------
-# File Handling Functions
+# Streaming Answers
 # ------------------------
-def load_characters():
-    if not os.path.exists(CHARACTERS_PATH):
-        with open(CHARACTERS_PATH, "w") as f:
-            json.dump({}, f)
-    with open(CHARACTERS_PATH, "r") as f:
-        return json.load(f)
-
-def save_characters(characters):
-    with open(CHARACTERS_PATH, "w") as f:
-        json.dump(characters, f, indent=4)
-
-def get_server_characters(guild_id: int):
-    characters = load_characters()
-    gid = str(guild_id)
-    if gid not in characters:
-        characters[gid] = DEFAULT_CHARACTERS.copy()
-        save_characters(characters)
-    return characters[gid]
-
-def update_server_characters(guild_id: int, new_data: dict):
-    characters = load_characters()
-    characters[str(guild_id)] = new_data
-    save_characters(characters)
+EMBED_FIELD_LIMIT = 1024    # The answer starts in the embed's response field...
+MESSAGE_LIMIT = 2000        # ...and overflows into plain messages of up to this many characters
+STREAM_EDIT_SECONDS = 1.0   # At most one round of edits per answer in this window; newer chunks are coalesced
+
+first_reply_latency = LatencyHistogram()  # /ask deferred to the first part of the answer being shown
+answer_latency = LatencyHistogram()       # /ask deferred to the complete answer being shown
+
+# Set up by gemini_commands(); kept here so get_ask_stats() can report on them
+gemini_client = None
+response_cache = None
+
+def get_ask_stats():
+    return {
+        "first_reply_latency": first_reply_latency.summary(),
+        "answer_latency": answer_latency.summary(),
+        "gemini": gemini_client.stats() if gemini_client else None,
+        "cache": response_cache.stats() if response_cache else None,
+    }
+
+def split_answer(text: str):
+    """
+    Splits an answer into the embed field's part and the overflow messages' parts, breaking at
+    whitespace where possible. Each break only depends on the text before it, so the parts
+    already sent don't change as more of a streamed answer arrives.
+    """
+    parts = []
+    limit = EMBED_FIELD_LIMIT
+    while len(text) > limit:
+        cut = max(text.rfind("\n", 0, limit + 1), text.rfind(" ", 0, limit + 1))
+        if cut < limit // 2:
+            cut = limit
+        parts.append(text[:cut])
+        text = text[cut:].lstrip()
+        limit = MESSAGE_LIMIT
+    if text or not parts:
+        parts.append(text)
+    return parts
+
+class StreamingAnswer:
+    """
+    The /ask reply to one question, shown while the answer is still being generated.
+    The first message holds the embed; text that doesn't fit overflows into more
+    messages instead of being cut off. update() can be called on every chunk: the
+    messages are edited at most once per STREAM_EDIT_SECONDS, with the latest text.
+    """
+    def __init__(self, interaction: discord.Interaction, question: str, title: str):
+        self.interaction = interaction
+        self.question = question
+        self.title = title
+        self.text = ""
+        self.done = False
+        self.error = None    # Shown on the embed if the answer couldn't be finished
+        self.messages = []   # Messages sent so far, in order
+        self.shown = []      # What each message currently shows
+        self.started = time.monotonic()
+        self._rendered = None
+        self._task = None
+        self._last_edit = 0.0
+
+    def update(self, text: str):
+        self.text = text
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._send_edits())
+
+    async def finish(self, text: str):
+        """Shows the complete answer (sending it in one go if nothing was streamed)."""
+        self.done = True
+        self.update(text)
+        await self._task
+        answer_latency.observe(time.monotonic() - self.started)
+
+    async def fail(self, error: str):
+        """Ends the answer with an error: whatever part of it was already shown stays, with the error under it."""
+        self.error = error
+        self.done = True
+        self.update(self.text)
+        await self._task
+
+    async def _send_edits(self):
+        while self._rendered != (self.text, self.done):
+            delay = self._last_edit + STREAM_EDIT_SECONDS - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last_edit = time.monotonic()
+            self._rendered = (self.text, self.done)
+            try:
+                await self._render(*self._rendered)
+            except discord.HTTPException as e:
+                print(f"Failed to update /ask answer: {e}")
+
+    def _embed(self, part: str, done: bool):
+        embed = discord.Embed(title=self.title, color=0x4285F4)
+        embed.add_field(name=f"{self.interaction.user.display_name} asked:", value=f"**{self.question}**", inline=False)
+        embed.add_field(name="Response:", value=part or ("*(No response)*" if done else "..."), inline=False)
+        if self.error:
+            embed.add_field(name="⚠️ Answer incomplete", value=self.error, inline=False)
+        if done:
+            embed.set_footer(text=f"Asked by: {self.interaction.user.display_name}", icon_url=self.interaction.user.display_avatar.url)
+        else:
+            embed.set_footer(text="Answering...")
+        return embed
+
+    async def _render(self, text: str, done: bool):
+        for i, part in enumerate(split_answer(text)):
+            shown = (part, done) if i == 0 else part  # Only the embed changes when the answer completes
+            if i < len(self.shown):
+                if self.shown[i] != shown:
+                    if i == 0:
+                        await self.messages[0].edit(embed=self._embed(part, done))
+                    else:
+                        await self.messages[i].edit(content=part)
+            elif i == 0:
+                self.messages.append(await self.interaction.followup.send(embed=self._embed(part, done), wait=True))
+                first_reply_latency.observe(time.monotonic() - self.started)
+            else:
+                self.messages.append(await self.interaction.followup.send(content=part, wait=True))
+            if i < len(self.shown):
+                self.shown[i] = shown
+            else:
+                self.shown.append(shown)
 
 # ------------------------
 # Main Gemini Commands
 # ------------------------
-def gemini_commands(model, tree: app_commands.CommandTree):
+def gemini_commands(model, tree: app_commands.CommandTree, config: dict):
+    """Registers the Gemini commands and returns the /ask response cache (start its autosave in on_ready)."""
+    global gemini_client, response_cache
+    # Queues /ask per guild, caps concurrent Gemini calls and enforces deadlines (see gemini_client.py)
+    gemini_client = GeminiClient(model)
+    # Repeated questions to the same character are answered from here instead of calling Gemini again
+    # Optional "ask_cache_persist" config key: keep cached answers across restarts (off by default,
+    # so user questions and answers aren't written to disk unless the owner opts in)
+    response_cache = create_response_cache(ASK_CACHE_PATH if config.get("ask_cache_persist", False) else None)
+    # Loaded once; autocomplete runs on every keystroke, so it must never touch the disk
+    character_store = create_character_store()
 
     async def character_autocomplete(interaction: discord.Interaction, current: str):
-        server_chars = get_server_characters(interaction.guild.id)
-        character_names = [key.replace("_desc", "") for key in server_chars.keys()]
         return [
             app_commands.Choice(name=name, value=name)
-            for name in character_names if current.lower() in name.lower()
+            for name in character_store.complete(interaction.guild.id, current)
         ]
 
     async def handle_gemini_question(interaction: discord.Interaction, question: str, personality_key: str, title: str):
-        server_chars = get_server_characters(interaction.guild.id)
+        server_chars = character_store.get(interaction.guild.id)
 
         if personality_key not in server_chars:
             await interaction.followup.send(f"No description found for `{personality_key.replace('_desc', '')}`.")
             return
 
-        full_query = server_chars[personality_key] + question.strip()
-
-        try:
-            response = model.generate_content(full_query)
-            gemini_response_text = response.text
-
-            embed = discord.Embed(
-                title=title,
-                color=0x4285F4
-            )
+        personality = server_chars[personality_key]
+        full_query = personality + question.strip()
 
-            embed.add_field(name=f"{interaction.user.display_name} asked:", value=f"**{question}**", inline=False)
+        # A cache hit (or an identical question already being answered) shows up all at once instead
+        answer = StreamingAnswer(interaction, question, title)
 
-            if len(gemini_response_text) > 1024:
-                await interaction.followup.send(
-                    f"**Gemini's Response:**\n{gemini_response_text[:1900]}...\n(Response too long, truncated.)"
-                )
-            else:
-                embed.add_field(name="Response:", value=gemini_response_text, inline=False)
+        async def generate():
+            return await gemini_client.stream(interaction.guild.id, full_query, answer.update)
 
-            embed.set_footer(text=f"Asked by: {interaction.user.display_name}", icon_url=interaction.user.avatar.url)
-            await interaction.followup.send(embed=embed)
+        try:
+            gemini_response_text = await response_cache.get_or_generate(interaction.guild.id, personality, question, generate)
+            await answer.finish(gemini_response_text)
 
+        except GeminiBusy:
+            await answer.fail("Gemini is swamped with questions from this server right now. Try again in a minute!")
+        except GeminiTimeout:
+            await answer.fail("Gemini took too long to answer. Try asking again!")
         except Exception as e:
-            await interaction.followup.send(f"Error getting response from Gemini: `{e}`")
+            await answer.fail(f"Error getting response from Gemini: `{e}`")
             print(f"Gemini Error: {e}")
 
     # ------------------------
@@ -98,7 +196,7 @@ def gemini_commands(model, tree: app_commands.CommandTree):
         # Update player diamonds for using command
         server_id = str(interaction.guild.id) if interaction.guild else "global"
         player_id = str(interaction.user.id)
-        update_player_diamonds(server_id, player_id, 100)
+        update_player_diamonds(server_id, player_id, 100, "ask")
                 
         key = f"{name.lower()}_desc"
         title = f"{name.capitalize()}'s Answer ✨"
@@ -114,8 +212,7 @@ def gemini_commands(model, tree: app_commands.CommandTree):
         name = name.lower()
         key = f"{name}_desc"
 
-        server_chars = get_server_characters(interaction.guild.id)
-        if key in server_chars:
+        if key in character_store.get(interaction.guild.id):
             await interaction.followup.send(f"A character named `{name}` already exists. Try another name or delete it first.")
             return
 
@@ -123,8 +220,8 @@ def gemini_commands(model, tree: app_commands.CommandTree):
             f"Talk like a person that fits the following description. {description}. "
             "Keep the reply relatively brief (2 paragraphs or less) and you dont have to mention every personality trait."
         )
-        server_chars[key] = description_2
-        update_server_characters(interaction.guild.id, server_chars)
+        character_store.add(interaction.guild.id, key, description_2)
+        response_cache.invalidate(interaction.guild.id, description_2)
         await interaction.followup.send(f"Character `{name}` added successfully!")
 
     # ------------------------
@@ -136,14 +233,12 @@ def gemini_commands(model, tree: app_commands.CommandTree):
         await interaction.response.defer(ephemeral=True)
 
         key = f"{name.lower()}_desc"
-        server_chars = get_server_characters(interaction.guild.id)
-
-        if key not in server_chars:
+        prompt = character_store.delete(interaction.guild.id, key)
+        if prompt is None:
             await interaction.followup.send(f"No character named `{name}` found.")
             return
 
-        del server_chars[key]
-        update_server_characters(interaction.guild.id, server_chars)
+        response_cache.invalidate(interaction.guild.id, prompt)
         await interaction.followup.send(f"Character `{name}` has been deleted.")
 
     # ------------------------
@@ -153,8 +248,7 @@ def gemini_commands(model, tree: app_commands.CommandTree):
     async def list_characters_command(interaction: discord.Interaction):
         await interaction.response.defer()
 
-        server_chars = get_server_characters(interaction.guild.id)
-        character_names = [key.replace("_desc", "") for key in server_chars.keys()]
+        character_names = [character_name(key) for key in character_store.get(interaction.guild.id)]
 
         if not character_names:
             await interaction.followup.send("No characters are currently available.")
@@ -166,3 +260,28 @@ def gemini_commands(model, tree: app_commands.CommandTree):
             color=0x00FF99
         )
         await interaction.followup.send(embed=embed)
+
+    # ------------------------
+    # /ask_stats
+    # ------------------------
+    @tree.command(name="ask_stats", description="Shows /ask latency and cache statistics.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def ask_stats_command(interaction: discord.Interaction):
+        stats = get_ask_stats()
+        gemini, cache = stats["gemini"], stats["cache"]
+        lookups = cache["hits"] + cache["misses"] + cache["coalesced"]
+        embed = discord.Embed(title="/ask Stats", color=0x4285F4)
+        embed.add_field(name="First reply shown", value=format_latency(stats["first_reply_latency"]), inline=False)
+        embed.add_field(name="Full answer shown", value=format_latency(stats["answer_latency"]), inline=False)
+        embed.add_field(name="Gemini time to first chunk", value=format_latency(gemini["time_to_first_chunk"]), inline=False)
+        embed.add_field(name="Gemini queue wait", value=format_latency(gemini["queue_wait"]), inline=False)
+        embed.add_field(name="Gemini calls",
+                        value=f"{gemini['completed']} done, {gemini['timeouts']} timed out, {gemini['errors']} failed, "
+                              f"{gemini['rejected']} turned away, {gemini['in_flight']} running, {gemini['queued']} queued",
+                        inline=False)
+        embed.add_field(name="Answer cache",
+                        value=f"{cache['entries']} answers, {cache['hits'] + cache['coalesced']}/{lookups} questions answered without a new call",
+                        inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    return response_cache
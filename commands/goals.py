@@ -3,7 +3,9 @@ from discord import app_commands
 import json
 import os
 import random
-from .bank import load_bank_data, save_bank_data, get_player_diamonds, update_player_diamonds
+import asyncio
+from .bank import get_player_diamonds, apply_batch, transfer, round_diamonds, InsufficientDiamonds
+from .async_io import run_blocking
 
 GOALS_FILE = "data/goals.json"
 
@@ -23,6 +25,15 @@ def save_goals(data):
     with open(GOALS_FILE, "w") as f:
         json.dump(data, f, indent=4)
 
+# Held across load -> modify -> save so concurrent contributions don't overwrite each other
+goals_lock = asyncio.Lock()
+
+async def load_goals_async():
+    return await run_blocking(load_goals)
+
+async def save_goals_async(data):
+    await run_blocking(save_goals, data)
+
 def format_progress(current, target):
     return f"{current} / {target}"
 
@@ -42,7 +53,7 @@ def setup_goal_commands(tree: app_commands.CommandTree, master_server_id: int):
             )
             return
 
-        goals = load_goals()
+        goals = await load_goals_async()
         if not goals:
             await interaction.response.send_message("There are no active goals right now.")
             return
@@ -76,25 +87,25 @@ def setup_goal_commands(tree: app_commands.CommandTree, master_server_id: int):
         server_id = str(interaction.guild_id)
         player_id = str(interaction.user.id)
 
-        goals = load_goals()
-        goals_list = get_goals_list(goals)
+        async with goals_lock:
+            goals = await load_goals_async()
+            goals_list = get_goals_list(goals)
 
-        if goal_id < 1 or goal_id > len(goals_list):
-            await interaction.response.send_message("Invalid goal ID. Use /goals to see goal numbers.", ephemeral=True)
-            return
-
-        _, goal_desc, current, target = goals_list[goal_id - 1]
+            if goal_id < 1 or goal_id > len(goals_list):
+                await interaction.response.send_message("Invalid goal ID. Use /goals to see goal numbers.", ephemeral=True)
+                return
 
-        player_balance = get_player_diamonds(server_id, player_id)
-        if player_balance < diamonds:
-            await interaction.response.send_message(f"You don't have enough diamonds. Your balance: {player_balance}", ephemeral=True)
-            return
+            _, goal_desc, current, target = goals_list[goal_id - 1]
 
-        new_progress = min(current + diamonds, target)
-        goals[goal_desc][0] = new_progress
+            try:
+                apply_batch(server_id, [(player_id, -diamonds)], "goal")
+            except InsufficientDiamonds as e:
+                await interaction.response.send_message(f"You don't have enough diamonds. Your balance: {e.balance}", ephemeral=True)
+                return
 
-        update_player_diamonds(server_id, player_id, -diamonds)
-        save_goals(goals)
+            new_progress = min(current + diamonds, target)
+            goals[goal_desc][0] = new_progress
+            await save_goals_async(goals)
 
         await interaction.response.send_message(
             f"Successfully contributed {diamonds} diamonds to **{goal_desc}**! "
@@ -127,19 +138,18 @@ def setup_goal_commands(tree: app_commands.CommandTree, master_server_id: int):
             )
             return
 
-        donor_balance = get_player_diamonds(server_id, donor_id)
-        if donor_balance < diamonds:
+        # Debit the donor and credit the recipient (+10% charity boost) in one step
+        bonus = round_diamonds(diamonds * 0.1)
+        try:
+            apply_batch(server_id, [(donor_id, -diamonds), (recipient_id, diamonds + bonus)], "donate")
+        except InsufficientDiamonds as e:
             await interaction.response.send_message(
-                f"You don't have enough diamonds. Your balance: {donor_balance}",
+                f"You don't have enough diamonds. Your balance: {e.balance}",
                 ephemeral=True
             )
             return
 
-        # Update both balances
-        update_player_diamonds(server_id, donor_id, -diamonds)
-        update_player_diamonds(server_id, recipient_id, diamonds * 1.1)
-
-        await interaction.response.send_message( f"💎 {interaction.user.mention} donated **{diamonds} diamonds plus {diamonds * 0.1} diamonds (+10% charity boost)** to {member.mention}!")
+        await interaction.response.send_message( f"💎 {interaction.user.mention} donated **{diamonds} diamonds plus {bonus} diamonds (+10% charity boost)** to {member.mention}!")
         
     @tree.command(name="steal", description="Attempt to steal diamonds from another player.")
     @app_commands.describe(member="The member you want to steal from",diamonds="Amount of diamonds you want to steal")
@@ -186,20 +196,28 @@ def setup_goal_commands(tree: app_commands.CommandTree, master_server_id: int):
 
         result_message = f"🎲 You rolled **{roll1}** and **{roll2}** (total **{total_roll}**).\n"
 
-        if total_roll >= 9:
-            # Success
-            update_player_diamonds(server_id, stealer_id, diamonds)
-            update_player_diamonds(server_id, victim_id, -diamonds)
-            result_message += f"✅ Success! You stole **{diamonds} diamonds** from {member.mention}!"
-        elif total_roll <= 4:
-            # Critical fail
-            update_player_diamonds(server_id, stealer_id, -diamonds)
-            result_message += f"❌ Critical fail! You lost **{diamonds} diamonds** to {member.mention}!"
-        else:
-            # Mild fail
-            penalty = random.choice([0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.35]) * diamonds
-            penalty = min(penalty, stealer_balance)  # Can't lose more than you have
-            update_player_diamonds(server_id, stealer_id, -penalty)
-            result_message += f"⚠️ Fail! You lost **{penalty} diamonds** in the process."
+        # Balances are re-checked when the batch is applied, since another steal may have landed meanwhile.
+        try:
+            if total_roll >= 9:
+                # Success
+                transfer(server_id, victim_id, stealer_id, diamonds, "steal")
+                result_message += f"✅ Success! You stole **{diamonds} diamonds** from {member.mention}!"
+            elif total_roll <= 4:
+                # Critical fail
+                apply_batch(server_id, [(stealer_id, -diamonds)], "steal")
+                result_message += f"❌ Critical fail! You lost **{diamonds} diamonds** to {member.mention}!"
+            else:
+                # Mild fail
+                penalty = round_diamonds(random.choice([0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.35]) * diamonds)
+                penalty = min(penalty, stealer_balance)  # Can't lose more than you have
+                apply_batch(server_id, [(stealer_id, -penalty)], "steal")
+                result_message += f"⚠️ Fail! You lost **{penalty} diamonds** in the process."
+        except InsufficientDiamonds as e:
+            who = "You don't" if e.player_id == stealer_id else f"{member.display_name} doesn't"
+            await interaction.response.send_message(
+                f"{who} have enough diamonds anymore (balance: {e.balance}). Nothing was taken.",
+                ephemeral=True
+            )
+            return
 
         await interaction.response.send_message(result_message)
@@ -4,6 +4,7 @@ from discord import app_commands
 import aiohttp
 from io import BytesIO
 import openai
+from .async_io import run_blocking
 
 # The setup function now accepts master_server_id
 def image_commands(openai_client, tree: app_commands.CommandTree, master_server_id: int):
@@ -27,7 +28,8 @@ def image_commands(openai_client, tree: app_commands.CommandTree, master_server_
 
         try:
             # Create image via DALL·E 3
-            response = openai_client.images.generate(
+            response = await run_blocking(
+                openai_client.images.generate,
                 model="dall-e-3",
                 prompt=prompt,
                 size="1024x1024",
@@ -0,0 +1,49 @@
+import bisect
+
+# --- Leaderboard Index ---
+class LeaderboardIndex:
+    """
+    Per-server list of (-diamonds, player_id) kept sorted as balances change, so the
+    top k is a slice and a player's rank is a binary search.
+    A server's list is built the first time it is read; after that, every balance change updates it.
+    """
+    def __init__(self):
+        self.entries = {}   # server_id -> sorted [(-diamonds, player_id), ...]
+        self.balances = {}  # server_id -> {player_id: diamonds as indexed}
+
+    def is_indexed(self, server_id: str):
+        return server_id in self.entries
+
+    def build(self, server_id: str, balances: dict):
+        self.balances[server_id] = dict(balances)
+        self.entries[server_id] = sorted((-amount, player_id) for player_id, amount in balances.items())
+
+    def update(self, server_id: str, player_id: str, new_balance):
+        """Moves a player to their new position. Ignored for servers nobody has looked at yet."""
+        if server_id not in self.entries:
+            return
+        entries = self.entries[server_id]
+        balances = self.balances[server_id]
+        old_balance = balances.get(player_id)
+        if old_balance == new_balance:
+            return
+        if old_balance is not None:
+            del entries[bisect.bisect_left(entries, (-old_balance, player_id))]
+        bisect.insort(entries, (-new_balance, player_id))
+        balances[player_id] = new_balance
+
+    def top(self, server_id: str, k: int = 10):
+        """Returns [(player_id, diamonds), ...] for the k richest players."""
+        return [(player_id, -neg_amount) for neg_amount, player_id in self.entries[server_id][:k]]
+
+    def rank(self, server_id: str, player_id: str):
+        """Returns (rank, total_players) with rank starting at 1, or None if the player isn't on the board."""
+        balance = self.balances[server_id].get(player_id)
+        if balance is None:
+            return None
+        entries = self.entries[server_id]
+        return bisect.bisect_left(entries, (-balance, player_id)) + 1, len(entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.balances.clear()
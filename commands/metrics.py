@@ -0,0 +1,50 @@
+import bisect
+
+# Upper bounds of the latency buckets, in milliseconds (the last bucket catches everything slower)
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram: O(1) memory, cheap enough to observe on every call."""
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.bounds = list(buckets_ms)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float):
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p: float):
+        """
+        Upper bound of the bucket holding the p-th percentile (0-100), capped at the slowest
+        observation, or None if nothing was observed.
+        """
+        if not self.count:
+            return None
+        target = self.count * p / 100
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, round(self.max_ms, 2))
+        return round(self.max_ms, 2)
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": round(self.max_ms, 2),
+        }
+
+def format_latency(summary):
+    """One line for a stats embed from a LatencyHistogram summary."""
+    if not summary["count"]:
+        return "no data yet"
+    return f"p50 ≤ {summary['p50_ms']:g} ms, p95 ≤ {summary['p95_ms']:g} ms, max {summary['max_ms']:g} ms ({summary['count']} samples)"
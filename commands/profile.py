@@ -1,10 +1,11 @@
 import discord
 from discord import app_commands
-import json
 import os
 import io
+import asyncio
 from PIL import Image, ImageDraw, ImageFont
-from .bank import load_bank_data, save_bank_data, get_player_diamonds, update_player_diamonds
+from .bank import apply_batch, get_player_rank, InsufficientDiamonds
+from .async_io import run_blocking, read_json_async, write_json_async
 
 # Paths relative to this file
 BASE_DIR = os.path.dirname(__file__)
@@ -12,17 +13,17 @@ BADGES_FILE = os.path.join(os.path.dirname(BASE_DIR), "data/badges.json")
 SHOP_FILE = os.path.join(os.path.dirname(BASE_DIR), "data/shop.json") 
 ICONS_FOLDER = os.path.join(os.path.dirname(BASE_DIR), "icons")
 
-def load_badges():
-    if not os.path.exists(BADGES_FILE):
-        return {}
-    with open(BADGES_FILE, "r") as f:
-        return json.load(f)
-
-def load_shop():
-    if not os.path.exists(SHOP_FILE):
-        return {}
-    with open(SHOP_FILE, "r") as f:
-        return json.load(f)
+# Held across load -> modify -> save so two purchases can't overwrite each other's badges
+badges_lock = asyncio.Lock()
+
+async def load_badges_async():
+    return await read_json_async(BADGES_FILE)
+
+async def save_badges_async(data):
+    await write_json_async(BADGES_FILE, data)
+
+async def load_shop_async():
+    return await read_json_async(SHOP_FILE)
     
 def create_badge_strip(icon_paths, badge_size=(64, 64), padding=4):
     """
@@ -164,8 +165,13 @@ def setup_profile_commands(tree: app_commands.CommandTree, master_server_id: int
         embed.set_thumbnail(url=member.display_avatar.url)
         embed.add_field(name="Roles", value=roles_display, inline=False)
 
+        # diamond leaderboard rank in this server
+        rank = get_player_rank(str(interaction.guild_id), str(member.id))
+        if rank:
+            embed.add_field(name="Diamond Rank", value=f"#{rank[0]} of {rank[1]}", inline=False)
+
         # badges
-        badges_data = load_badges()
+        badges_data = await load_badges_async()
         user_badges = badges_data.get(str(member.id), [])  # list of badge ids
 
         # build list of icon file paths (case-sensitive!)
@@ -178,7 +184,7 @@ def setup_profile_commands(tree: app_commands.CommandTree, master_server_id: int
                 print(f"Badge icon not found: {candidate}")
 
         if icon_paths:
-            buf = create_badge_strip(icon_paths, badge_size=(64, 64), padding=6)
+            buf = await run_blocking(create_badge_strip, icon_paths, badge_size=(64, 64), padding=6)
             if buf:
                 discord_file = discord.File(fp=buf, filename="badges.png")
                 # We add an empty badges field (or names) and attach the compiled image
@@ -195,9 +201,9 @@ def setup_profile_commands(tree: app_commands.CommandTree, master_server_id: int
     @tree.command(name="shop", description="View items available for purchase with diamonds.")
     async def shop(interaction: discord.Interaction):
 
-        shop_items = load_shop()
+        shop_items = await load_shop_async()
 
-        buf = create_shop_grid(shop_items)
+        buf = await run_blocking(create_shop_grid, shop_items)
         discord_file = discord.File(fp=buf, filename="shop_grid.png")
 
         embed = discord.Embed(
@@ -214,7 +220,7 @@ def setup_profile_commands(tree: app_commands.CommandTree, master_server_id: int
     @app_commands.describe(badge_name="The name of the badge you want to buy.")
     async def redeem_shop(interaction: discord.Interaction, badge_name: str):
 
-        shop_items = load_shop()
+        shop_items = await load_shop_async()
         badge_name_lower = badge_name.lower()
 
         # Check if badge exists in the shop
@@ -232,40 +238,37 @@ def setup_profile_commands(tree: app_commands.CommandTree, master_server_id: int
             )
             return
 
-        # Load badges
-        badges_data = load_badges()
-        user_id_str = str(interaction.user.id)
-
-        # If user has no entry yet, create one
-        if user_id_str not in badges_data:
-            badges_data[user_id_str] = []
-
-        # Check if user already owns this badge
-        if matched_badge in badges_data[user_id_str]:
-            await interaction.response.send_message(
-                f"⚠️ You already own the `{matched_badge}` badge.",
-                ephemeral=True
-            )
-            return
-
-        # Get diamond balance from bank
-        server_id_str = str(interaction.guild_id)
-        user_diamonds = get_player_diamonds(server_id_str, user_id_str)
-
-        if user_diamonds < badge_price:
-            await interaction.response.send_message(
-                f"💎 You need {badge_price} diamonds to buy `{matched_badge}`, but you only have {user_diamonds}.",
-                ephemeral=True
-            )
-            return
+        async with badges_lock:
+            # Load badges
+            badges_data = await load_badges_async()
+            user_id_str = str(interaction.user.id)
+
+            # If user has no entry yet, create one
+            if user_id_str not in badges_data:
+                badges_data[user_id_str] = []
+
+            # Check if user already owns this badge
+            if matched_badge in badges_data[user_id_str]:
+                await interaction.response.send_message(
+                    f"⚠️ You already own the `{matched_badge}` badge.",
+                    ephemeral=True
+                )
+                return
 
-        # Deduct diamonds
-        update_player_diamonds(server_id_str, user_id_str, -badge_price)
+            # Check the balance and deduct diamonds in one step
+            server_id_str = str(interaction.guild_id)
+            try:
+                apply_batch(server_id_str, [(user_id_str, -badge_price)], "shop")
+            except InsufficientDiamonds as e:
+                await interaction.response.send_message(
+                    f"💎 You need {badge_price} diamonds to buy `{matched_badge}`, but you only have {e.balance}.",
+                    ephemeral=True
+                )
+                return
 
-        # Save badge to user
-        badges_data[user_id_str].append(matched_badge)
-        with open(BADGES_FILE, "w") as f:
-            json.dump(badges_data, f, indent=4)
+            # Save badge to user
+            badges_data[user_id_str].append(matched_badge)
+            await save_badges_async(badges_data)
 
         await interaction.response.send_message(
             f"✅ You successfully purchased the `{matched_badge}` badge for {badge_price} diamonds! 🎉"
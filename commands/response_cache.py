@@ -0,0 +1,136 @@
+import asyncio
+import atexit
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from .async_io import read_json, JsonPersister
+
+# --- Constants ---
+MAX_CACHED_RESPONSES = 2000
+RESPONSE_TTL_SECONDS = 6 * 60 * 60  # Answers go stale after a while, even for the same question
+CACHE_SAVE_SECONDS = 120
+
+def prompt_hash(prompt: str):
+    """Short, stable id of a personality prompt: editing the prompt changes the id."""
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:16]
+
+def normalize_question(question: str):
+    """Folds trivial differences ("Who are you?" vs "who are you") into one cache key."""
+    return re.sub(r"\s+", " ", question.strip().lower()).rstrip("?!. ")
+
+class ResponseCache:
+    """
+    Answers to /ask keyed by (guild, personality prompt hash, normalized question).
+
+    Entries live in an OrderedDict in least-recently-used order, so evicting past
+    max_entries is O(1); each one also expires after ttl seconds. Identical
+    questions that arrive while the first is still being generated share that one
+    call instead of starting their own. Optionally saved to disk.
+    """
+    def __init__(self, path: str = None, max_entries: int = MAX_CACHED_RESPONSES, ttl: float = RESPONSE_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # (guild_id, prompt_hash, question) -> (text, expires_at)
+        self._inflight = {}           # key -> Task generating the answer
+        self.persister = JsonPersister(path, self.snapshot, name="the response cache")
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        if path:
+            self.load()
+
+    @staticmethod
+    def key(guild_id, prompt: str, question: str):
+        return (str(guild_id), prompt_hash(prompt), normalize_question(question))
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        text, expires_at = entry
+        if expires_at < time.time():
+            del self.entries[key]
+            self.persister.mark_dirty()
+            return None
+        self.entries.move_to_end(key)
+        return text
+
+    def put(self, key, text: str):
+        self.entries[key] = (text, time.time() + self.ttl)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        self.persister.mark_dirty()
+
+    async def get_or_generate(self, guild_id, prompt: str, question: str, generate):
+        """
+        The cached answer, or the result of `await generate()` (which is then cached).
+        Concurrent callers with the same key share one generate() call; errors are shared but not cached.
+        """
+        key = self.key(guild_id, prompt, question)
+        text = self.get(key)
+        if text is not None:
+            self.hits += 1
+            return text
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = self._inflight[key] = asyncio.get_running_loop().create_task(self._fill(key, generate))
+        else:
+            self.coalesced += 1
+        # shield: one caller giving up must not cancel the answer the others are waiting for
+        return await asyncio.shield(task)
+
+    async def _fill(self, key, generate):
+        try:
+            text = await generate()
+            self.put(key, text)
+            return text
+        finally:
+            del self._inflight[key]
+
+    def invalidate(self, guild_id, prompt: str):
+        """Drops every cached answer for one character's prompt in a guild (call when it's edited or deleted)."""
+        target = (str(guild_id), prompt_hash(prompt))
+        stale = [key for key in self.entries if key[:2] == target]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self.persister.mark_dirty()
+        return len(stale)
+
+    # --- Persistence ---
+    def load(self):
+        now = time.time()
+        saved = read_json(self.path, default=[])
+        live = sorted((entry for entry in saved if entry[4] > now), key=lambda entry: entry[4])
+        self.entries = OrderedDict(((guild, phash, question), (text, expires_at)) for guild, phash, question, text, expires_at in live)
+
+    def snapshot(self):
+        return [[*key, text, expires_at] for key, (text, expires_at) in self.entries.items()]
+
+    def save(self):
+        self.persister.save()
+
+    def start_autosave(self, interval: float = CACHE_SAVE_SECONDS):
+        self.persister.start_autosave(interval)
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+        }
+
+def create_response_cache(path: str = None, max_entries: int = MAX_CACHED_RESPONSES, ttl: float = RESPONSE_TTL_SECONDS):
+    """Creates a response cache; with a path, its answers are kept across restarts."""
+    cache = ResponseCache(path, max_entries, ttl)
+    atexit.register(cache.save)
+    return cache
@@ -0,0 +1,71 @@
+import asyncio
+import atexit
+import time
+from .bank import credit_players
+from .metrics import LatencyHistogram
+
+# --- Constants ---
+REWARD_FLUSH_SECONDS = 5  # How often queued chat rewards are paid out
+
+class ChatRewardAccumulator:
+    """
+    Collects chat-activity rewards from on_message in O(1) and pays them out in one
+    ledger batch every few seconds, coalescing repeated rewards for the same account.
+    """
+    def __init__(self, interval: float = REWARD_FLUSH_SECONDS):
+        self.interval = interval
+        self.pending = {}  # (server_id, player_id) -> diamonds owed
+        self.enqueued = 0  # Rewards queued since startup
+        self.paid = 0      # Rewards paid out since startup
+        self.batches = 0
+        self.flush_latency = LatencyHistogram()
+        self._task = None
+
+    def enqueue(self, server_id: str, player_id: str, amount):
+        key = (server_id, player_id)
+        self.pending[key] = self.pending.get(key, 0) + amount
+        self.enqueued += 1
+
+    def flush(self):
+        """Pays out everything queued so far. Returns the number of accounts credited."""
+        if not self.pending:
+            return 0
+        start = time.perf_counter()
+        batch, self.pending = self.pending, {}
+        try:
+            credit_players(batch, "chat_reward")
+        except Exception:
+            # Put the rewards back (merged with anything queued meanwhile) so they aren't lost.
+            for key, amount in batch.items():
+                self.pending[key] = self.pending.get(key, 0) + amount
+            raise
+        self.flush_latency.observe(time.perf_counter() - start)
+        self.paid += len(batch)
+        self.batches += 1
+        return len(batch)
+
+    def start(self):
+        """Starts the background payout task on the running event loop (safe to call twice)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Failed to pay chat rewards: {e}")
+
+    def stats(self):
+        return {
+            "queue_depth": len(self.pending),
+            "enqueued": self.enqueued,
+            "accounts_paid": self.paid,
+            "batches": self.batches,
+            "flush_latency": self.flush_latency.summary(),
+        }
+
+chat_rewards = ChatRewardAccumulator()
+# Registered after the bank's own exit flush, so it runs first and the payout gets saved.
+atexit.register(chat_rewards.flush)
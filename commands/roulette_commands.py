@@ -1,9 +1,10 @@
-from .bank import load_bank_data, save_bank_data, get_player_diamonds, update_player_diamonds
+from .bank import load_bank_data, save_bank_data, get_player_diamonds, update_player_diamonds, apply_batch, InsufficientDiamonds
 import discord
 from discord.ext import commands
 from discord import app_commands
 import random
 import asyncio
+import time
 
 # --- Roulette Game Constants ---
 ROULETTE_NUMBERS = list(range(37))  # 0-36
@@ -20,66 +21,153 @@ NUMBER_COLORS = {
     31: 'black', 32: 'red', 33: 'black', 34: 'red', 35: 'black', 36: 'red',
 }
 
+# --- Payout Table ---
+# Every valid bet is compiled once into a vector of payout multipliers (stake included) with one
+# entry per pocket, so settling any number of bets is a lookup at the winning pocket's index.
+OUTSIDE_BETS = {
+    'red': lambda n: NUMBER_COLORS[n] == 'red',
+    'black': lambda n: NUMBER_COLORS[n] == 'black',
+    'odd': lambda n: n % 2 == 1,
+    'even': lambda n: n % 2 == 0,
+    'low': lambda n: n <= 18,
+    'high': lambda n: n >= 19,
+    '1st12': lambda n: n <= 12,
+    '2nd12': lambda n: 13 <= n <= 24,
+    '3rd12': lambda n: n >= 25,
+    'col1': lambda n: n % 3 == 1,
+    'col2': lambda n: n % 3 == 2,
+    'col3': lambda n: n % 3 == 0,
+}
+OUTSIDE_MULTIPLIERS = {'1st12': 3, '2nd12': 3, '3rd12': 3, 'col1': 3, 'col2': 3, 'col3': 3}  # The rest pay 2
+INSIDE_MULTIPLIERS = {1: 36, 2: 18, 3: 12, 4: 9}  # By how many numbers the bet covers
+
+def pocket_index(number):
+    """Position of a wheel number in the payout vectors ('00' comes after 36)."""
+    return 37 if number == '00' else number
+
+def build_inside_bets():
+    """
+    Every split, street and corner allowed by the table layout (1-36 in rows of three,
+    with 0 touching 1, 2 and 3), as sorted tuples.
+    """
+    splits, streets, corners = set(), set(), set()
+    for n in range(1, 37):
+        if n % 3 != 0:
+            splits.add((n, n + 1))        # Side by side in a row
+        if n <= 33:
+            splits.add((n, n + 3))        # Above/below in a column
+        if n % 3 == 1:
+            streets.add((n, n + 1, n + 2))
+        if n % 3 != 0 and n <= 32:
+            corners.add((n, n + 1, n + 3, n + 4))
+    splits.update({(0, 1), (0, 2), (0, 3)})
+    streets.update({(0, 1, 2), (0, 2, 3)})  # Trios
+    corners.add((0, 1, 2, 3))               # First four
+    return {2: splits, 3: streets, 4: corners}
+
+INSIDE_BETS = build_inside_bets()
+
+def compile_payout_table(numbers=ROULETTE_NUMBERS):
+    """{bet: (multiplier per pocket, ...)} for every bet on a wheel with the given numbers."""
+    size = max(pocket_index(n) for n in numbers) + 1
+    table = {}
+    for number in numbers:
+        vector = [0] * size
+        vector[pocket_index(number)] = INSIDE_MULTIPLIERS[1]
+        table[number] = tuple(vector)
+    for count, bets in INSIDE_BETS.items():
+        for bet in bets:
+            vector = [0] * size
+            for number in bet:
+                vector[number] = INSIDE_MULTIPLIERS[count]
+            table[bet] = tuple(vector)
+    for bet, wins in OUTSIDE_BETS.items():
+        vector = [0] * size
+        for number in numbers:
+            if number not in (0, '00') and wins(number):
+                vector[pocket_index(number)] = OUTSIDE_MULTIPLIERS.get(bet, 2)
+        table[bet] = tuple(vector)
+    return table
+
+PAYOUT_TABLE = compile_payout_table(ROULETTE_NUMBERS)  # European wheel, what the game spins
+
 # --- Roulette Game Logic ---
-def get_payout(bet_type, winning_number):
+MAX_SLIP_BETS = 20
+INSIDE_BET_NAMES = {2: "split", 3: "street", 4: "corner"}
+
+def parse_bet(text: str, table=PAYOUT_TABLE):
+    """
+    Turns a bet as typed ('red', '17', '00', '1-2', '1-2-3', '1-2-4-5', 'col2', ...) into its
+    key in the payout table. Raises ValueError with a message for the player if it isn't a valid bet.
+    """
+    text = text.strip().lower()
+    if text in OUTSIDE_BETS:
+        return text
+    if text == '00':
+        if '00' not in table:
+            raise ValueError("There's no 00 on this wheel.")
+        return '00'
+    try:
+        numbers = tuple(sorted(int(x) for x in text.split('-')))
+    except ValueError:
+        raise ValueError(f"'{text}' isn't a bet I know. Try red, black, odd, even, low, high, 1st12, col1, a number or numbers like 1-2.")
+    if len(numbers) == 1:
+        if numbers[0] not in table:
+            raise ValueError("Straight Up bet must be a number between 0 and 36.")
+        return numbers[0]
+    if len(numbers) not in INSIDE_BETS:
+        raise ValueError(f"'{text}' covers {len(numbers)} numbers; splits cover 2, streets 3 and corners 4.")
+    if numbers not in INSIDE_BETS[len(numbers)]:
+        kind = INSIDE_BET_NAMES[len(numbers)]
+        raise ValueError(f"{'-'.join(map(str, numbers))} isn't a valid {kind} on the table layout.")
+    return numbers
+
+def parse_slip(text: str, table=PAYOUT_TABLE):
+    """
+    Parses a bet slip like "red:50, 17:10, col2:20" into {bet: amount}, adding up repeated bets.
+    Raises ValueError with a message for the player on the first bad entry.
+    """
+    bets = {}
+    for entry in filter(None, (part.strip() for part in text.split(','))):
+        bet_text, sep, amount_text = entry.rpartition(':')
+        if not sep:
+            raise ValueError(f"'{entry}' needs an amount, like red:50.")
+        try:
+            amount = int(amount_text)
+        except ValueError:
+            raise ValueError(f"'{amount_text.strip()}' in '{entry}' isn't a whole number of diamonds.")
+        if amount <= 0:
+            raise ValueError(f"'{entry}': bets must be positive.")
+        bet = parse_bet(bet_text, table)
+        bets[bet] = bets.get(bet, 0) + amount
+    if not bets:
+        raise ValueError("Your slip is empty. Write bets like red:50, 17:10, col2:20.")
+    if len(bets) > MAX_SLIP_BETS:
+        raise ValueError(f"A slip can hold at most {MAX_SLIP_BETS} bets.")
+    return bets
+
+def slip_payouts(bets, table=PAYOUT_TABLE):
+    """Diamonds returned for every pocket by a slip of {bet: amount}, so any spin settles with one lookup."""
+    totals = [0] * len(next(iter(table.values())))
+    for bet, amount in bets.items():
+        for i, multiplier in enumerate(table[bet]):
+            if multiplier:
+                totals[i] += amount * multiplier
+    return totals
+
+def slip_return(bets, winning_index: int, table=PAYOUT_TABLE):
+    """Diamonds returned by a slip of {bet: amount} when the pocket at winning_index comes up."""
+    return sum(amount * table[bet][winning_index] for bet, amount in bets.items())
+
+def get_payout(bet_type, winning_number, table=PAYOUT_TABLE):
     """
     Calculates the payout multiplier for a given bet type and winning number.
     Returns the multiplier (e.g., 2 for even money, 36 for straight up).
     """
-    winning_color = NUMBER_COLORS.get(winning_number)
-    winning_number_is_int = isinstance(winning_number, int)
-
-    # Straight Up
-    if isinstance(bet_type, int) and bet_type == winning_number:
-        return 36
-    if isinstance(bet_type, str) and bet_type == winning_number:  # For '00'
-        return 36
-
-    # Split
-    if isinstance(bet_type, tuple) and winning_number in bet_type and len(bet_type) == 2:
-        return 18
-    
-    # Street
-    if isinstance(bet_type, tuple) and winning_number in bet_type and len(bet_type) == 3:
-        return 12
-
-    # Corner
-    if isinstance(bet_type, tuple) and winning_number in bet_type and len(bet_type) == 4:
-        return 9
-    
-    # Dozen
-    if bet_type == '1st12' and 1 <= winning_number <= 12:
-        return 3
-    if bet_type == '2nd12' and 13 <= winning_number <= 24:
-        return 3
-    if bet_type == '3rd12' and 25 <= winning_number <= 36:
-        return 3
-
-    # Column
-    if bet_type == 'col1' and winning_number_is_int and winning_number % 3 == 1:
-        return 3
-    if bet_type == 'col2' and winning_number_is_int and winning_number % 3 == 2:
-        return 3
-    if bet_type == 'col3' and winning_number_is_int and winning_number % 3 == 0 and winning_number != 0:
-        return 3
-
-    # High or Low
-    if bet_type == 'low' and 1 <= winning_number <= 18:
-        return 2
-    if bet_type == 'high' and 19 <= winning_number <= 36:
-        return 2
-
-    # Red or Black
-    if bet_type == winning_color:
-        return 2
-
-    # Odd or Even
-    if bet_type == 'even' and winning_number_is_int and winning_number != 0 and winning_number % 2 == 0:
-        return 2
-    if bet_type == 'odd' and winning_number_is_int and winning_number % 2 != 0:
-        return 2
-
-    return 0
+    if isinstance(bet_type, tuple):
+        bet_type = tuple(sorted(bet_type))
+    vector = table.get(bet_type)
+    return vector[pocket_index(winning_number)] if vector else 0
 
 def format_bet_string(bet_type):
     """Returns a user-friendly string for the bet type."""
@@ -98,6 +186,105 @@ def format_bet_string(bet_type):
     if bet_type in ['col1', 'col2', 'col3']: return f"a bet on the **{bet_type.replace('col', 'column ')}**"
     return str(bet_type)
 
+# --- Shared Tables ---
+MIN_ROUND_SECONDS = 10
+MAX_ROUND_SECONDS = 120
+MAX_ROUND_PLAYERS = 50
+
+class RouletteRound:
+    """
+    One betting window on a channel's shared table. Slips are checked against the player's
+    balance when placed but only held in memory; at the spin every stake is re-checked and
+    every player's net is settled in a single ledger batch.
+    """
+    def __init__(self, channel_id, server_id: str, seconds: int):
+        self.channel_id = str(channel_id)
+        self.server_id = server_id
+        self.closes_at = time.monotonic() + seconds
+        self.closed = False
+        self.bets = {}    # player_id -> {bet: amount}
+        self.stakes = {}  # player_id -> diamonds on the table
+
+    def seconds_left(self):
+        return max(0, int(self.closes_at - time.monotonic()))
+
+    def place(self, player_id: str, bets):
+        """
+        Adds a player's slip to the round. Returns their total on the table.
+        Raises ValueError if the round is closed or full, or they can't cover the stake.
+        """
+        if self.closed:
+            raise ValueError("Bets are closed, the wheel is spinning!")
+        if player_id not in self.bets and len(self.bets) >= MAX_ROUND_PLAYERS:
+            raise ValueError(f"This round already has {MAX_ROUND_PLAYERS} players. Catch the next one!")
+        combined = dict(self.bets.get(player_id, {}))
+        for bet, amount in bets.items():
+            combined[bet] = combined.get(bet, 0) + amount
+        if len(combined) > MAX_SLIP_BETS:
+            raise ValueError(f"You can have at most {MAX_SLIP_BETS} bets in one round.")
+        staked = self.stakes.get(player_id, 0) + sum(bets.values())
+        balance = get_player_diamonds(self.server_id, player_id)
+        if staked > balance:
+            raise ValueError(f"Your bets this round need 💎 {staked}, but you only have 💎 {balance}.")
+        self.bets[player_id] = combined
+        self.stakes[player_id] = staked
+        return staked
+
+    def settle(self, winning_number):
+        """
+        Settles every player in one ledger batch and returns ({player_id: (staked, returned)}, voided ids).
+        A player who no longer has their stake (spent elsewhere during the round) has their bets voided.
+        """
+        self.closed = True
+        winning_index = pocket_index(winning_number)
+        # Stakes are checked here, not just netted in the batch: a win must not pay out on diamonds
+        # the player no longer has. Nothing awaits between this check and the batch.
+        voided = [player_id for player_id, staked in self.stakes.items()
+                  if get_player_diamonds(self.server_id, player_id) < staked]
+        results = {
+            player_id: (self.stakes[player_id], slip_return(bets, winning_index))
+            for player_id, bets in self.bets.items() if player_id not in voided
+        }
+        changes = [(player_id, returned - staked) for player_id, (staked, returned) in results.items() if returned != staked]
+        if changes:
+            apply_batch(self.server_id, changes, "roulette")
+        return results, voided
+
+open_rounds = {}  # channel_id -> RouletteRound
+
+async def run_round(channel, channel_id: int, table_round: RouletteRound):
+    """Waits out the betting window, spins once for everyone and posts one summary."""
+    await asyncio.sleep(max(0, table_round.closes_at - time.monotonic()))
+    del open_rounds[channel_id]
+    winning_number = random.choice(ROULETTE_NUMBERS)
+    try:
+        results, voided = table_round.settle(winning_number)
+    except Exception as e:
+        print(f"Roulette round in channel {channel_id} failed to settle: {e}")
+        try:
+            await channel.send("The roulette round was cancelled. No diamonds were taken.")
+        except discord.HTTPException:
+            pass
+        return
+
+    embed = discord.Embed(title="🎰 Roulette Table Results 🎰", color=discord.Color.gold())
+    embed.add_field(name="Winning Number", value=f"**{winning_number}** ({NUMBER_COLORS.get(winning_number, 'Unknown').capitalize()})", inline=False)
+    if results:
+        ranked = sorted(results.items(), key=lambda item: item[1][1] - item[1][0], reverse=True)
+        embed.description = "\n".join(
+            f"<@{player_id}>: staked 💎 {staked}, {'won 💎 ' + str(returned) if returned else 'lost it all'} ({returned - staked:+})"
+            for player_id, (staked, returned) in ranked
+        )
+        embed.add_field(name="Table Total", value=f"💎 {sum(staked for staked, _ in results.values())} staked, 💎 {sum(returned for _, returned in results.values())} paid out", inline=False)
+    elif not voided:
+        embed.description = "No bets were placed this round."
+    if voided:
+        embed.add_field(name="Voided", value=" ".join(f"<@{player_id}>" for player_id in voided) + " no longer had the diamonds to cover their bets.", inline=False)
+    try:
+        await channel.send(embed=embed)
+    except discord.HTTPException as e:
+        print(f"Failed to post roulette round results in channel {channel_id}: {e}")
+
 def setup_roulette_commands(tree: app_commands.CommandTree):
     """Sets up the Roulette slash command."""
 
@@ -137,40 +324,33 @@ def setup_roulette_commands(tree: app_commands.CommandTree):
             return
 
         # 2. Parse and Validate the Bet Type and Value
-        parsed_bet = None
-        if bet_type.value in ['red', 'black', 'odd', 'even', 'low', 'high', '1st12', '2nd12', '3rd12', 'col1', 'col2', 'col3']:
+        if bet_type.value in OUTSIDE_BETS:
             parsed_bet = bet_type.value
         elif bet_type.value == 'straight_up':
             try:
-                parsed_bet = int(value)
-                if parsed_bet not in range(37):
-                    await interaction.response.send_message("Straight Up bet must be a number between 0 and 36.", ephemeral=True)
-                    return
-            except (ValueError, TypeError):
-                await interaction.response.send_message("For a Straight Up bet, please provide a number between 0 and 36.", ephemeral=True)
+                parsed_bet = parse_bet(value)
+                if not isinstance(parsed_bet, int):
+                    raise ValueError("For a Straight Up bet, please provide a number between 0 and 36.")
+            except (ValueError, AttributeError) as e:
+                message = str(e) if value else "For a Straight Up bet, please provide a number between 0 and 36."
+                await interaction.response.send_message(message, ephemeral=True)
                 return
         elif bet_type.value in ['split', 'street', 'corner']:
             try:
-                numbers = tuple(int(x) for x in value.split('-'))
-                if bet_type.value == 'split' and len(numbers) == 2:
-                    parsed_bet = numbers
-                elif bet_type.value == 'street' and len(numbers) == 3:
-                    parsed_bet = numbers
-                elif bet_type.value == 'corner' and len(numbers) == 4:
-                    parsed_bet = numbers
-                else:
-                    await interaction.response.send_message(f"Invalid number of values for {bet_type.value} bet.", ephemeral=True)
-                    return
-                # Add basic validation here if needed (omitted for brevity)
-            except Exception:
-                await interaction.response.send_message(f"For a {bet_type.value} bet, provide numbers separated by dashes (e.g. '1-2').", ephemeral=True)
+                parsed_bet = parse_bet(value)
+            except (ValueError, AttributeError) as e:
+                message = str(e) if value else f"For a {bet_type.value} bet, provide numbers separated by dashes (e.g. '1-2')."
+                await interaction.response.send_message(message, ephemeral=True)
+                return
+            if not isinstance(parsed_bet, tuple) or INSIDE_BET_NAMES[len(parsed_bet)] != bet_type.value:
+                await interaction.response.send_message(f"Invalid number of values for {bet_type.value} bet.", ephemeral=True)
                 return
         else:
             await interaction.response.send_message("Invalid bet type.", ephemeral=True)
             return
 
         # 3. Deduct the bet upfront
-        update_player_diamonds(server_id, player_id, -bet)
+        update_player_diamonds(server_id, player_id, -bet, "roulette")
 
         # 4. Spin the wheel
         winning_number = random.choice(ROULETTE_NUMBERS)  # For now, European roulette 0-36
@@ -180,7 +360,7 @@ def setup_roulette_commands(tree: app_commands.CommandTree):
 
         # 5. Calculate and update diamonds if player won
         if payout_multiplier > 0:
-            update_player_diamonds(server_id, player_id, winnings)
+            update_player_diamonds(server_id, player_id, winnings, "roulette")
 
         # 6. Prepare result message
         embed = discord.Embed(title="🎰 Roulette Results 🎰", color=discord.Color.gold())
@@ -194,3 +374,77 @@ def setup_roulette_commands(tree: app_commands.CommandTree):
 
         await interaction.response.send_message(embed=embed)
 
+    @tree.command(name="roulette_slip", description="Place a whole slip of roulette bets on one spin!")
+    @app_commands.describe(slip="Bets as bet:amount separated by commas, e.g. 'red:50, 17:10, col2:20, 1-2:5'.")
+    async def roulette_slip(interaction: discord.Interaction, slip: str):
+        server_id = str(interaction.guild.id)
+        player_id = str(interaction.user.id)
+
+        try:
+            bets = parse_slip(slip)
+        except ValueError as e:
+            await interaction.response.send_message(str(e), ephemeral=True)
+            return
+        total_bet = sum(bets.values())
+        current_diamonds = get_player_diamonds(server_id, player_id)
+        if total_bet > current_diamonds:
+            await interaction.response.send_message(f"Your slip adds up to 💎 {total_bet}, but you only have 💎 {current_diamonds}.", ephemeral=True)
+            return
+
+        # One spin, one lookup, one ledger write for the whole slip
+        winning_number = random.choice(ROULETTE_NUMBERS)
+        winning_index = pocket_index(winning_number)
+        returned = slip_payouts(bets)[winning_index]
+        try:
+            balances = apply_batch(server_id, [(player_id, returned - total_bet)], "roulette")
+        except InsufficientDiamonds as e:
+            await interaction.response.send_message(f"You don't have enough diamonds! You have 💎 {e.balance}.", ephemeral=True)
+            return
+
+        embed = discord.Embed(title="🎰 Roulette Results 🎰", color=discord.Color.green() if returned > total_bet else discord.Color.red())
+        embed.add_field(name="Winning Number", value=f"**{winning_number}** ({NUMBER_COLORS.get(winning_number, 'Unknown').capitalize()})", inline=False)
+        lines = []
+        for bet, amount in bets.items():
+            won = amount * PAYOUT_TABLE[bet][winning_index]
+            label = '-'.join(map(str, bet)) if isinstance(bet, tuple) else bet
+            lines.append(f"{'✅' if won else '❌'} `{label}` 💎 {amount}" + (f" → 💎 {won}" if won else ""))
+        embed.add_field(name="Your Slip", value="\n".join(lines), inline=False)
+        embed.add_field(name="Staked", value=f"💎 {total_bet}", inline=True)
+        embed.add_field(name="Returned", value=f"💎 {returned}", inline=True)
+        embed.add_field(name="Net", value=f"💎 {returned - total_bet:+}", inline=True)
+        embed.set_footer(text=f"Your new balance: 💎 {balances[player_id]}")
+        await interaction.response.send_message(embed=embed)
+
+    @tree.command(name="roulette_table", description="Open a shared roulette round in this channel!")
+    @app_commands.describe(seconds=f"How long the table takes bets before the spin ({MIN_ROUND_SECONDS}-{MAX_ROUND_SECONDS}).")
+    async def roulette_table(interaction: discord.Interaction, seconds: int = 30):
+        channel_id = interaction.channel_id
+        if channel_id in open_rounds:
+            await interaction.response.send_message(f"A round is already open here! It spins in {open_rounds[channel_id].seconds_left()}s.", ephemeral=True)
+            return
+        if not MIN_ROUND_SECONDS <= seconds <= MAX_ROUND_SECONDS:
+            await interaction.response.send_message(f"Rounds can last between {MIN_ROUND_SECONDS} and {MAX_ROUND_SECONDS} seconds.", ephemeral=True)
+            return
+        table_round = open_rounds[channel_id] = RouletteRound(channel_id, str(interaction.guild.id), seconds)
+        asyncio.get_running_loop().create_task(run_round(interaction.channel, channel_id, table_round))
+        embed = discord.Embed(title="🎰 Roulette Table Open 🎰", color=discord.Color.blue(),
+                              description=f"Place your bets with `/roulette_bet` in the next **{seconds} seconds**!\n"
+                                          "Example: `red:50, 17:10, col2:20, 1-2:5`")
+        await interaction.response.send_message(embed=embed)
+
+    @tree.command(name="roulette_bet", description="Bet on the open roulette round in this channel.")
+    @app_commands.describe(slip="Bets as bet:amount separated by commas, e.g. 'red:50, 17:10, col2:20, 1-2:5'.")
+    async def roulette_bet(interaction: discord.Interaction, slip: str):
+        table_round = open_rounds.get(interaction.channel_id)
+        if table_round is None:
+            await interaction.response.send_message("There's no open round here. Start one with `/roulette_table`!", ephemeral=True)
+            return
+        player_id = str(interaction.user.id)
+        try:
+            bets = parse_slip(slip)
+            staked = table_round.place(player_id, bets)
+        except ValueError as e:
+            await interaction.response.send_message(str(e), ephemeral=True)
+            return
+        await interaction.response.send_message(
+            f"Bets placed! You have 💎 {staked} on the table. The wheel spins in {table_round.seconds_left()}s.", ephemeral=True)
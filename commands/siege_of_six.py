@@ -7,11 +7,28 @@ import nltk
 from nltk.corpus import words, brown
 import asyncio
 from collections import Counter
+import functools
+from .async_io import run_blocking
 
 # NLTK downloads for word and frequency data
 nltk.download('words')
 nltk.download('brown')
 
+@functools.lru_cache(maxsize=1)
+def get_brown_frequencies():
+    """Word frequencies in the Brown corpus (computed once, it's a million-word scan)."""
+    return Counter(w.lower() for w in brown.words())
+
+def build_word_list(min_freq, max_freq):
+    brown_freq = get_brown_frequencies()
+    return [
+        w.lower() for w in words.words()
+        if (
+            len(w) == 6 and w.isalpha() and
+            min_freq <= brown_freq[w.lower()] <= max_freq
+        )
+    ]
+
 def siege_of_six_commands(config, tree: app_commands.CommandTree):
     
     @tree.command(name="sosrules", description="Shows the rules for Siege of Six.")
@@ -51,16 +68,8 @@ def siege_of_six_commands(config, tree: app_commands.CommandTree):
 
         await interaction.response.defer() # Defer the response as this can take time
 
-        brown_words = [w.lower() for w in brown.words()]
-        brown_freq = Counter(brown_words)
-
-        word_list = [
-            w.lower() for w in words.words()
-            if (
-                len(w) == 6 and w.isalpha() and
-                min_freq <= brown_freq[w.lower()] <= max_freq
-            )
-        ]
+        # Scanning the corpora takes seconds, so it runs off the event loop
+        word_list = await run_blocking(build_word_list, min_freq, max_freq)
 
         if not word_list:
             await interaction.followup.send("❌ No suitable words found for that difficulty. Try a different one.")
@@ -130,7 +139,7 @@ def siege_of_six_commands(config, tree: app_commands.CommandTree):
                 # Give 30 diamonds for losing by timeout
                 server_id = str(interaction.guild.id) if interaction.guild else "global"
                 player_id = str(interaction.user.id)
-                update_player_diamonds(server_id, player_id, 30)
+                update_player_diamonds(server_id, player_id, 30, "siege_of_six")
                 await interaction.followup.send("💎 You earned 30 diamonds for participating!")
                 return
 
@@ -157,7 +166,7 @@ def siege_of_six_commands(config, tree: app_commands.CommandTree):
                 # Update player diamonds
                 server_id = str(interaction.guild.id) if interaction.guild else "global"
                 player_id = str(interaction.user.id)
-                update_player_diamonds(server_id, player_id, reward)
+                update_player_diamonds(server_id, player_id, reward, "siege_of_six")
 
                 await interaction.followup.send(f"💎 You earned {reward} diamonds for winning!")
 
@@ -177,6 +186,6 @@ def siege_of_six_commands(config, tree: app_commands.CommandTree):
         # Give 30 diamonds for losing
         server_id = str(interaction.guild.id) if interaction.guild else "global"
         player_id = str(interaction.user.id)
-        update_player_diamonds(server_id, player_id, 30)
+        update_player_diamonds(server_id, player_id, 30, "siege_of_six")
 
         await interaction.followup.send("💎 You earned 30 diamonds for participating!")
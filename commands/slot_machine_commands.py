@@ -1,15 +1,47 @@
-from .bank import load_bank_data, save_bank_data, get_player_diamonds, update_player_diamonds
+from .bank import get_top_players, get_player_diamonds, update_player_diamonds, round_diamonds
+from .user_names import name_resolver
 import discord
 from discord.ext import commands
 from discord import app_commands
 import random
 import os
 
+# --- Constants ---
+MAX_BET = 100
+MAX_AUTOPLAY_SPINS = 50
+
+# --- Slot Machine Definitions ---
+# Shared with the simulator (slot_simulator.py) and the odds engine (slot_odds.py) so they can't drift from the live game.
+SLOT_EMOJIS = ['🍗', '🏦', '💰', '💲','🪙', '❌']
+SLOT_WEIGHTS = [0.02, 0.06, 0.15, 0.27, 0.40, 0.10]
+
+PAYOUT_MULTIPLIERS = {
+    '❌': -1.0,  # Lose your bet again if ❌ matches
+    '🪙': 1,
+    '💲': 2,
+    '💰': 4,
+    '🏦': 8,
+    '🍗': 20
+}
+
+# Every (row, col) line that pays when all three cells match, in the order wins are reported
+WIN_LINES = (
+    # Horizontal
+    ((0, 0), (0, 1), (0, 2)),
+    ((1, 0), (1, 1), (1, 2)),
+    ((2, 0), (2, 1), (2, 2)),
+    # Vertical
+    ((0, 0), (1, 0), (2, 0)),
+    ((0, 1), (1, 1), (2, 1)),
+    ((0, 2), (1, 2), (2, 2)),
+    # Diagonals
+    ((0, 0), (1, 1), (2, 2)),
+    ((0, 2), (1, 1), (2, 0)),
+)
+
 # --- Slot Machine Logic ---
 def get_weighted_emoji():
-    emojis = ['🍗', '🏦', '💰', '💲','🪙', '❌']
-    weights = [0.02, 0.06, 0.15, 0.27, 0.40, 0.10]
-    return random.choices(emojis, weights, k=1)[0]
+    return random.choices(SLOT_EMOJIS, SLOT_WEIGHTS, k=1)[0]
 
 def generate_grid():
     return [[get_weighted_emoji() for _ in range(3)] for _ in range(3)]
@@ -23,41 +55,48 @@ def format_grid_for_display(grid):
 
 def check_for_wins(grid):
     winning_emojis = []
-
-    # Horizontal
-    for row in grid:
-        if row[0] == row[1] == row[2]:
-            winning_emojis.append(row[0])
-
-    # Vertical
-    for col in range(3):
-        if grid[0][col] == grid[1][col] == grid[2][col]:
-            winning_emojis.append(grid[0][col])
-
-    # Diagonals
-    if grid[0][0] == grid[1][1] == grid[2][2]:
-        winning_emojis.append(grid[0][0])
-    if grid[0][2] == grid[1][1] == grid[2][0]:
-        winning_emojis.append(grid[0][2])
-
+    for (r1, c1), (r2, c2), (r3, c3) in WIN_LINES:
+        if grid[r1][c1] == grid[r2][c2] == grid[r3][c3]:
+            winning_emojis.append(grid[r1][c1])
     return winning_emojis
 
 def calculate_payout(bet_amount, winning_emojis):
-    payout_multipliers = {
-        '❌': -1.0,  # Lose your bet again if ❌ matches
-        '🪙': 1,
-        '💲': 2,
-        '💰': 4,
-        '🏦': 8,
-        '🍗': 20
-    }
-    return sum(bet_amount * payout_multipliers.get(emoji, 0) for emoji in winning_emojis)
+    return sum(bet_amount * PAYOUT_MULTIPLIERS.get(emoji, 0) for emoji in winning_emojis)
+
+def net_winnings(bet_amount, total_winnings):
+    """Net balance change for one spin: a positive payout comes with the bet back, otherwise the bet is lost too."""
+    return total_winnings if total_winnings > 0 else total_winnings - bet_amount
+
+def run_autoplay(bet_amount, spins, balance, stop_loss=None, take_profit=None):
+    """
+    Plays up to `spins` spins in one go and returns [(grid, winning_emojis, net), ...].
+    Stops early once the running net hits -stop_loss or +take_profit, or when the
+    running balance can no longer cover the bet.
+    """
+    results = []
+    net_total = 0
+    for _ in range(spins):
+        if balance + net_total < bet_amount:
+            break
+        grid = generate_grid()
+        winning_emojis = check_for_wins(grid)
+        net = net_winnings(bet_amount, calculate_payout(bet_amount, winning_emojis))
+        results.append((grid, winning_emojis, net))
+        net_total += net
+        if stop_loss is not None and net_total <= -stop_loss:
+            break
+        if take_profit is not None and net_total >= take_profit:
+            break
+    return results
 
 # --- Command Setup ---
 def setup_slot_machine_commands(tree: app_commands.CommandTree):
     @tree.command(name="slots", description="Play a game on the emoji slot machine!")
-    @app_commands.describe(bet="The amount of diamonds you want to bet.")
-    async def slots(interaction: discord.Interaction, bet: int):
+    @app_commands.describe(bet="The amount of diamonds you want to bet.",
+                           spins=f"Autoplay: how many spins to play in a row (1-{MAX_AUTOPLAY_SPINS}).",
+                           stop_loss="Autoplay: stop once you are down this many diamonds.",
+                           take_profit="Autoplay: stop once you are up this many diamonds.")
+    async def slots(interaction: discord.Interaction, bet: int, spins: int = 1, stop_loss: int = None, take_profit: int = None):
         server_id = str(interaction.guild.id)
         player_id = str(interaction.user.id)
 
@@ -67,15 +106,25 @@ def setup_slot_machine_commands(tree: app_commands.CommandTree):
         if bet <= 0:
             await interaction.response.send_message("You must bet a positive amount of diamonds!", ephemeral=True)
             return
-        if bet > 100:
-            await interaction.response.send_message("The maximum bet allowed is 💎 100!", ephemeral=True)
+        if bet > MAX_BET:
+            await interaction.response.send_message(f"The maximum bet allowed is 💎 {MAX_BET}!", ephemeral=True)
             return
         if bet > current_diamonds:
             await interaction.response.send_message(f"You don't have enough diamonds! You have 💎 {current_diamonds}.", ephemeral=True)
             return
+        if not 1 <= spins <= MAX_AUTOPLAY_SPINS:
+            await interaction.response.send_message(f"You can autoplay between 1 and {MAX_AUTOPLAY_SPINS} spins!", ephemeral=True)
+            return
+        if (stop_loss is not None and stop_loss <= 0) or (take_profit is not None and take_profit <= 0):
+            await interaction.response.send_message("Stop-loss and take-profit must be positive amounts of diamonds!", ephemeral=True)
+            return
+
+        if spins > 1:
+            await play_autoplay(interaction, server_id, player_id, bet, spins, current_diamonds, stop_loss, take_profit)
+            return
 
         # Take initial bet
-        update_player_diamonds(server_id, player_id, -1 * bet)
+        update_player_diamonds(server_id, player_id, -1 * bet, "slots")
 
         # Spin the machine
         grid = generate_grid()
@@ -95,7 +144,7 @@ def setup_slot_machine_commands(tree: app_commands.CommandTree):
                 total_winnings_with_bet = total_winnings + bet
                 win_message += f"You won: 💎 {total_winnings_with_bet:.2f}!"
                 embed.add_field(name="Result", value=win_message, inline=False)
-                update_player_diamonds(server_id, player_id, total_winnings + bet)  # Win = payout + bet back
+                update_player_diamonds(server_id, player_id, total_winnings + bet, "slots")  # Win = payout + bet back
             elif total_winnings < 0:
                 embed.color = discord.Color.red()
                 loss_message = "Ouch! ❌ matched, and you lost even more!\n"
@@ -103,7 +152,7 @@ def setup_slot_machine_commands(tree: app_commands.CommandTree):
                     loss_message += f"- 3 x {emoji} match!\n"
                 loss_message += f"Extra loss: 💎 {-total_winnings:.2f}!"
                 embed.add_field(name="Result", value=loss_message, inline=False)
-                update_player_diamonds(server_id, player_id, total_winnings)  # Extra loss (negative)
+                update_player_diamonds(server_id, player_id, total_winnings, "slots")  # Extra loss (negative)
             else:
                 embed.color = discord.Color.red()
                 embed.add_field(name="Result", value=f"No winning combinations. You lost 💎 {bet:.2f}.", inline=False)
@@ -118,27 +167,51 @@ def setup_slot_machine_commands(tree: app_commands.CommandTree):
 
         await interaction.response.send_message(embed=embed)
 
+    async def play_autoplay(interaction, server_id, player_id, bet, spins, current_diamonds, stop_loss, take_profit):
+        # All spins are played up front and settled with a single ledger update.
+        results = run_autoplay(bet, spins, current_diamonds, stop_loss, take_profit)
+        total_net = round_diamonds(sum(net for _, _, net in results))
+        update_player_diamonds(server_id, player_id, total_net, "slots")
+        final_diamonds = get_player_diamonds(server_id, player_id)
+
+        if len(results) < spins:
+            if stop_loss is not None and total_net <= -stop_loss:
+                stopped = f"Stop-loss hit after {len(results)} spins."
+            elif take_profit is not None and total_net >= take_profit:
+                stopped = f"Take-profit hit after {len(results)} spins."
+            else:
+                stopped = f"Out of diamonds for another bet after {len(results)} spins."
+        else:
+            stopped = f"Played all {spins} spins."
+
+        embed = discord.Embed(title="🎰 Emoji Slot Machine: Autoplay 🎰",
+                              color=discord.Color.green() if total_net > 0 else discord.Color.red())
+        embed.description = f"💎 {bet} per spin. {stopped}"
+        embed.add_field(name="Per Spin", value=" ".join(f"`{net:+g}`" for _, _, net in results), inline=False)
+
+        best_grid, best_emojis, best_net = max(results, key=lambda result: result[2])
+        if best_net > 0:
+            best_spin = [net for _, _, net in results].index(best_net) + 1
+            matches = ", ".join(f"3 x {emoji}" for emoji in best_emojis)
+            embed.add_field(name=f"Biggest Win (spin {best_spin})",
+                            value=f"{format_grid_for_display(best_grid)}{matches}: 💎 {best_net:+g}", inline=False)
+
+        embed.add_field(name="Net Result", value=f"💎 {total_net:+g}", inline=True)
+        embed.add_field(name="Your Diamonds", value=f"💎 {final_diamonds}", inline=True)
+        embed.set_footer(text="Good luck on your next spin!")
+        await interaction.response.send_message(embed=embed)
+
     @tree.command(name="bank", description="Shows the top 10 players with the most diamonds in this server")
     async def bank(interaction: discord.Interaction):
         server_id = str(interaction.guild.id)
-        bank_data = load_bank_data()
+        top_players = get_top_players(server_id, 10)
 
-        if server_id not in bank_data or not bank_data[server_id]:
+        if not top_players:
             await interaction.response.send_message("No players found yet! Start playing slots to get on the leaderboard.")
             return
 
-        leaderboard_entries = []
-        for player_id, diamonds in bank_data[server_id].items():
-            try:
-                user = await interaction.client.fetch_user(int(player_id))
-                leaderboard_entries.append({"name": user.display_name, "diamonds": diamonds})
-            except discord.NotFound:
-                leaderboard_entries.append({"name": f"Unknown User ({player_id})", "diamonds": diamonds})
-            except Exception as e:
-                print(f"Error fetching user {player_id}: {e}")
-                leaderboard_entries.append({"name": f"Error User ({player_id})", "diamonds": diamonds})
-
-        leaderboard_entries.sort(key=lambda x: x["diamonds"], reverse=True)
+        names = await name_resolver.resolve(interaction.client, interaction.guild, [player_id for player_id, _ in top_players])
+        leaderboard_entries = [{"name": names[player_id], "diamonds": diamonds} for player_id, diamonds in top_players]
 
         embed = discord.Embed(
             title=f"💎 Top 10 Diamond Holders in {interaction.guild.name} 💎",
@@ -147,7 +220,7 @@ def setup_slot_machine_commands(tree: app_commands.CommandTree):
 
         description_lines = [
             f"**{i+1}. {entry['name']}**: 💎 {entry['diamonds']}"
-            for i, entry in enumerate(leaderboard_entries[:10])
+            for i, entry in enumerate(leaderboard_entries)
         ]
         embed.description = "\n".join(description_lines)
 
@@ -0,0 +1,201 @@
+"""
+Exact odds for the /slots payout table.
+
+Enumerating all 6^9 grids is too slow, so the grid is split instead. Once the
+centre and the four corners are fixed, both diagonals are decided, and the
+remaining lines fall into two independent groups:
+    top/bottom middle cells -> top row, bottom row, middle column
+    left/right middle cells -> left column, right column, middle row
+Each group only depends on which corner pairs match and on the centre, so its
+payout distribution is worked out once per case (memoised) and reused. That
+leaves 6^5 corner/centre cases times a few classes per group: a weight-free
+"plan" of terms that is summed exactly with Fractions, or evaluated for many
+candidate weight vectors at once with NumPy ("what-if" mode).
+
+Run from the repository root:
+    python -m commands.slot_odds
+    python -m commands.slot_odds --weights 0.02,0.06,0.15,0.27,0.40,0.10 --weights 0.03,0.06,0.15,0.26,0.40,0.10
+    python -m commands.slot_odds --max-rtp 1.0  # exits 1 if the live table pays back more than it takes
+"""
+import argparse
+import functools
+import itertools
+import sys
+import time
+from fractions import Fraction
+import numpy as np
+from .slot_machine_commands import SLOT_EMOJIS, SLOT_WEIGHTS, PAYOUT_MULTIPLIERS
+
+WHAT_IF_CHUNK_BYTES = 64 * 1024 * 1024  # Upper bound on the temporaries of one what-if batch
+
+def _exact(value):
+    """Fraction of a table value as written (0.02 -> 1/50, not the nearest binary float)."""
+    return Fraction(str(value))
+
+def net_per_bet(multiplier):
+    """net_winnings() for a bet of 1, given the summed multiplier of the winning lines."""
+    return multiplier if multiplier > 0 else multiplier - 1
+
+class SlotOddsPlan:
+    """
+    The weight-independent part of the calculation for one payout table.
+
+    Every term is (corner/centre case, class of the top/bottom pair, class of the
+    left/right pair) with the summed multiplier of all winning lines. A term's
+    probability is P(case) * P(class 1) * P(class 2), all of which come straight
+    from the symbol weights.
+    """
+    def __init__(self, multipliers=None):
+        multipliers = PAYOUT_MULTIPLIERS if multipliers is None else multipliers
+        self.symbols = len(SLOT_EMOJIS)
+        self.multipliers = [_exact(multipliers.get(emoji, 0)) for emoji in SLOT_EMOJIS]
+        self.cases = list(itertools.product(range(self.symbols), repeat=5))  # (top-left, top-right, centre, bottom-left, bottom-right)
+        self.class_pairs = []  # class id -> [(x, y), ...] edge-pair symbols in that class
+        self.terms = []        # (case index, class id, class id, summed multiplier)
+        self._pair_classes = functools.lru_cache(maxsize=None)(self._build_pair_classes)
+        self._build_terms()
+
+    def _line(self, a, b, c):
+        return self.multipliers[a] if a == b == c else 0
+
+    def _build_pair_classes(self, end1, end2, centre):
+        """
+        Groups the 36 symbol pairs (x, y) of two opposite edge cells by the payout of
+        their three lines: x completes the first outer line if it equals end1 (the
+        symbol both of that line's corners share, or None), y likewise with end2, and
+        x == centre == y completes the middle line through them.
+        """
+        by_payout = {}
+        for x in range(self.symbols):
+            for y in range(self.symbols):
+                payout = (self.multipliers[end1] if x == end1 else 0) \
+                    + (self.multipliers[end2] if y == end2 else 0) \
+                    + self._line(x, centre, y)
+                by_payout.setdefault(payout, []).append((x, y))
+        classes = []
+        for payout, pairs in by_payout.items():
+            self.class_pairs.append(pairs)
+            classes.append((payout, len(self.class_pairs) - 1))
+        return classes
+
+    def _build_terms(self):
+        for case, (tl, tr, c, bl, br) in enumerate(self.cases):
+            diagonals = self._line(tl, c, br) + self._line(tr, c, bl)
+            # Top/bottom middle cells: top row (tl, tr), bottom row (bl, br), middle column
+            vertical = self._pair_classes(tl if tl == tr else None, bl if bl == br else None, c)
+            # Left/right middle cells: left column (tl, bl), right column (tr, br), middle row
+            horizontal = self._pair_classes(tl if tl == bl else None, tr if tr == br else None, c)
+            for payout1, class1 in vertical:
+                for payout2, class2 in horizontal:
+                    self.terms.append((case, class1, class2, diagonals + payout1 + payout2))
+
+    # --- Exact evaluation ---
+    def distribution(self, weights=SLOT_WEIGHTS):
+        """Exact {summed multiplier: probability} over all 6^9 grids, as Fractions."""
+        total = sum(_exact(w) for w in weights)
+        p = [_exact(w) / total for w in weights]
+        case_p = [p[tl] * p[tr] * p[c] * p[bl] * p[br] for tl, tr, c, bl, br in self.cases]
+        class_p = [sum(p[x] * p[y] for x, y in pairs) for pairs in self.class_pairs]
+        dist = {}
+        for case, class1, class2, multiplier in self.terms:
+            dist[multiplier] = dist.get(multiplier, 0) + case_p[case] * class_p[class1] * class_p[class2]
+        assert sum(dist.values()) == 1, "slot odds plan does not cover every grid exactly once"
+        return dict(sorted(dist.items()))
+
+    def exact(self, weights=SLOT_WEIGHTS):
+        """Exact RTP, house edge, variance and win frequency per spin at a bet of 1."""
+        dist = self.distribution(weights)
+        mean = sum(p * net_per_bet(m) for m, p in dist.items())
+        variance = sum(p * net_per_bet(m) ** 2 for m, p in dist.items()) - mean ** 2
+        return {
+            "rtp": 1 + mean,
+            "house_edge": -mean,
+            "variance": variance,
+            "win_frequency": sum(p for m, p in dist.items() if m > 0),
+            "distribution": dist,
+        }
+
+    # --- What-if evaluation ---
+    def _arrays(self):
+        if not hasattr(self, "_compiled"):
+            terms = np.array([(case, c1, c2) for case, c1, c2, _ in self.terms], dtype=np.int64)
+            multipliers = np.array([float(m) for *_, m in self.terms])
+            net = np.where(multipliers > 0, multipliers, multipliers - 1)
+            # Per-term values whose expectations give E[net], E[net^2] and P(win)
+            moments = np.stack([net, net ** 2, (multipliers > 0).astype(np.float64)], axis=1)
+            class_masks = np.zeros((len(self.class_pairs), self.symbols * self.symbols))
+            for class_id, pairs in enumerate(self.class_pairs):
+                for x, y in pairs:
+                    class_masks[class_id, x * self.symbols + y] = 1.0
+            self._compiled = (terms, moments, class_masks, np.array(self.cases))
+        return self._compiled
+
+    def what_if(self, candidates):
+        """
+        RTP, variance and win frequency (float64) for each row of `candidates`,
+        a (K, 6) array-like of symbol weights. Rows are normalised, so they don't need to sum to 1.
+        """
+        terms, moments, class_masks, cases = self._arrays()
+        weights = np.asarray(candidates, dtype=np.float64).reshape(-1, self.symbols)
+        weights = weights / weights.sum(axis=1, keepdims=True)
+        rows_per_chunk = max(1, WHAT_IF_CHUNK_BYTES // (8 * 2 * len(terms)))
+        results = []
+        for start in range(0, len(weights), rows_per_chunk):
+            w = weights[start:start + rows_per_chunk]
+            case_p = np.prod(w[:, cases], axis=2)                          # (K, cases)
+            pair_p = (w[:, :, None] * w[:, None, :]).reshape(len(w), -1)    # (K, 36)
+            class_p = pair_p @ class_masks.T                                # (K, classes)
+            term_p = case_p[:, terms[:, 0]] * class_p[:, terms[:, 1]] * class_p[:, terms[:, 2]]
+            results.append(term_p @ moments)                                # (K, 3)
+        expectations = np.concatenate(results) if results else np.zeros((0, 3))
+        mean = expectations[:, 0]
+        return {
+            "rtp": 1 + mean,
+            "house_edge": -mean,
+            "variance": expectations[:, 1] - mean ** 2,
+            "win_frequency": expectations[:, 2],
+        }
+
+@functools.lru_cache(maxsize=1)
+def live_plan():
+    """Plan for the live payout table (built once, ~0.1s)."""
+    return SlotOddsPlan()
+
+def exact_rtp(weights=SLOT_WEIGHTS):
+    """Exact return-to-player of the live table as a Fraction."""
+    return live_plan().exact(weights)["rtp"]
+
+def main():
+    parser = argparse.ArgumentParser(description="Exact return-to-player for /slots.")
+    parser.add_argument("--weights", action="append", default=[],
+                        help="Comma-separated candidate weights in SLOT_EMOJIS order (repeatable)")
+    parser.add_argument("--max-rtp", type=float, default=None,
+                        help="Exit with status 1 if the live table's exact RTP is above this")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    plan = live_plan()
+    result = plan.exact()
+    elapsed = time.perf_counter() - start
+    print(f"Live table ({len(plan.terms):,} terms, {elapsed:.2f}s)")
+    print(f"RTP:            {float(result['rtp']):.6%} (exactly {result['rtp']})")
+    print(f"House edge:     {float(result['house_edge']):.6%}")
+    print(f"Variance:       {float(result['variance']):.6f} (per spin, in bets²)")
+    print(f"Win frequency:  {float(result['win_frequency']):.6%} of spins pay out")
+
+    if args.weights:
+        candidates = [[float(w) for w in spec.split(",")] for spec in args.weights]
+        if any(len(c) != len(SLOT_EMOJIS) for c in candidates):
+            parser.error(f"each --weights needs {len(SLOT_EMOJIS)} values ({' '.join(SLOT_EMOJIS)})")
+        start = time.perf_counter()
+        what_if = plan.what_if(candidates)
+        print(f"\nWhat-if ({len(candidates)} candidates, {time.perf_counter() - start:.3f}s)")
+        for i, spec in enumerate(args.weights):
+            print(f"{spec:<40} RTP {what_if['rtp'][i]:.6%}  variance {what_if['variance'][i]:.4f}  win {what_if['win_frequency'][i]:.4%}")
+
+    if args.max_rtp is not None and result["rtp"] > _exact(args.max_rtp):
+        print(f"RTP {float(result['rtp']):.6%} is above the allowed {args.max_rtp:.6%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import discord
+import asyncio
+import time
+from collections import OrderedDict
+
+# --- Constants ---
+NAME_CACHE_SIZE = 5000           # Most user names kept between lookups
+NAME_CACHE_TTL_SECONDS = 60 * 60  # Names can change, so cached ones expire after an hour
+FETCH_CONCURRENCY = 5            # Parallel fetch_user calls per resolve
+
+class UserNameResolver:
+    """
+    Turns user ids into display names for leaderboards. Looks in the guild member cache
+    first, then in an LRU of earlier lookups, and only fetches what's left from the API, concurrently.
+    """
+    def __init__(self, max_size: int = NAME_CACHE_SIZE, ttl: float = NAME_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._cache = OrderedDict()  # user_id -> (name, expires_at)
+        self.member_hits = 0
+        self.cache_hits = 0
+        self.misses = 0
+        self.fetch_errors = 0
+
+    def _cached(self, user_id: str):
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return None
+        name, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._cache[user_id]
+            return None
+        self._cache.move_to_end(user_id)
+        return name
+
+    def _remember(self, user_id: str, name: str):
+        self._cache[user_id] = (name, time.monotonic() + self.ttl)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    async def _fetch(self, client, user_id: str, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            try:
+                user = await client.fetch_user(int(user_id))
+                name = user.display_name
+            except discord.NotFound:
+                name = f"Unknown User ({user_id})"
+            except Exception as e:
+                # Don't cache errors; the next lookup should try again.
+                print(f"Error fetching user {user_id}: {e}")
+                self.fetch_errors += 1
+                return f"Error User ({user_id})"
+        self._remember(user_id, name)
+        return name
+
+    async def resolve(self, client, guild, user_ids):
+        """Returns {user_id: display_name} for the given ids (only pass the ones you will show)."""
+        names = {}
+        missing = []
+        for user_id in user_ids:
+            member = guild.get_member(int(user_id)) if guild else None
+            if member is not None:
+                self.member_hits += 1
+                names[user_id] = member.display_name
+                continue
+            name = self._cached(user_id)
+            if name is not None:
+                self.cache_hits += 1
+                names[user_id] = name
+                continue
+            self.misses += 1
+            missing.append(user_id)
+
+        if missing:
+            semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+            fetched = await asyncio.gather(*(self._fetch(client, user_id, semaphore) for user_id in missing))
+            names.update(zip(missing, fetched))
+        return names
+
+    def stats(self):
+        return {
+            "cached_names": len(self._cache),
+            "member_hits": self.member_hits,
+            "cache_hits": self.cache_hits,
+            "misses": self.misses,
+            "fetch_errors": self.fetch_errors,
+        }
+
+name_resolver = UserNameResolver()
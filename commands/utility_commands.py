@@ -8,6 +8,11 @@ import textwrap
 import emoji
 import os
 import json
+from .async_io import run_blocking
+from .bank import get_bank_stats
+from .user_names import name_resolver
+from .rewards import chat_rewards
+from .metrics import format_latency
 
 def load_main_config():
     if not os.path.exists("data/config.json"):
@@ -104,6 +109,43 @@ def utility_commands(tree: app_commands.CommandTree, config: dict, master_server
             await interaction.response.send_message("This command is not available in this server.", ephemeral=True)
             return
 		
-        counter_config = load_main_config()
+        counter_config = await run_blocking(load_main_config)
         counter_value = counter_config.get("counter", 0)
         await interaction.response.send_message(f"The counter value is: {counter_value}")
+
+    @tree.command(name="bot_stats", description="Shows the bot's internal counters.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def bot_stats_command(interaction: discord.Interaction):
+        bank = get_bank_stats()
+        embed = discord.Embed(title="Bot Stats", color=discord.Color.dark_grey())
+        embed.add_field(
+            name="💎 Bank",
+            value=(
+                f"{bank['accounts']} accounts in {bank['servers']} servers ({bank['backend']} storage)\n"
+                f"{bank['updates']} balance updates, {bank['journal_appends']} journal appends, "
+                f"{bank['snapshot_flushes']} snapshot flushes\n"
+                f"{bank['dirty_accounts']} accounts waiting for the next flush, {bank['journal_records']} records in the journal"
+            ),
+            inline=False
+        )
+        rewards = chat_rewards.stats()
+        embed.add_field(
+            name="💬 Chat Rewards",
+            value=(
+                f"{rewards['enqueued']} rewards queued, {rewards['accounts_paid']} accounts paid in {rewards['batches']} batches, "
+                f"{rewards['queue_depth']} waiting\n"
+                f"Batch payout: {format_latency(rewards['flush_latency'])}"
+            ),
+            inline=False
+        )
+        names = name_resolver.stats()
+        embed.add_field(
+            name="👤 Name Lookups",
+            value=(
+                f"{names['member_hits']} from member caches, {names['cache_hits']} from the name cache, "
+                f"{names['misses']} fetched from Discord ({names['fetch_errors']} failed)\n"
+                f"{names['cached_names']} names cached"
+            ),
+            inline=False
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)